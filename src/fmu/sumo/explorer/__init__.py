@@ -10,4 +10,5 @@ except ImportError:
 
 from fmu.sumo.explorer.explorer import Explorer
 from fmu.sumo.explorer.filters import Filters
+from fmu.sumo.explorer.spatial import BBoxIndex
 from fmu.sumo.explorer.timefilter import TimeFilter, TimeType
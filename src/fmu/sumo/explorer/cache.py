@@ -1,5 +1,13 @@
+import asyncio
+import logging
+import time
 from collections import deque
+from datetime import datetime
 from threading import Lock
+from typing import Optional, Tuple
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
 
 # Based on https://llego.dev/posts/implement-lru-cache-python/
 
@@ -22,13 +30,24 @@ class LRUCache:
 
     def put(self, key, value):
         with self.lock:
+            if self.capacity <= 0:
+                return
             if key in self.cache:
                 self.access.remove(key)
-            elif len(self.cache) == self.capacity:
+            elif len(self.cache) >= self.capacity:
+                oldest = self.access.popleft()
+                del self.cache[oldest]
+            self.cache[key] = value
+            self.access.append(key)
+
+    def resize(self, capacity):
+        """Change the capacity, evicting the least recently used
+        entries that no longer fit; a capacity of 0 disables caching."""
+        with self.lock:
+            self.capacity = capacity
+            while len(self.cache) > max(capacity, 0):
                 oldest = self.access.popleft()
                 del self.cache[oldest]
-        self.cache[key] = value
-        self.access.append(key)
 
     def has(self, key):
         return key in self.cache
@@ -37,3 +56,124 @@ class LRUCache:
         with self.lock:
             self.cache.clear()
             self.access.clear()
+
+
+def _sas_expiry(sas: str) -> Optional[float]:
+    """Expiry time (seconds since the epoch) from the se= parameter of a
+    SAS token, or None if there is none."""
+    expiry = parse_qs(sas.lstrip("?")).get("se")
+    if not expiry:
+        return None
+    try:
+        return datetime.fromisoformat(expiry[0]).timestamp()
+    except ValueError:
+        return None
+
+
+def _sas_container_scoped(sas: str) -> bool:
+    """True if a SAS token grants access to a whole container (sr=c),
+    rather than to a single blob or directory."""
+    return parse_qs(sas.lstrip("?")).get("sr") == ["c"]
+
+
+class SasCache:
+    """Cache of SAS credentials for direct blob access.
+
+    Blob urls and tokens are kept per object. A container-scoped token
+    (sr=c) is also kept per scope, e.g. the case uuid, and used for
+    other objects in the same scope, with the url built from the base
+    uri (the blob url without the object uuid). Tokens are used until
+    `margin` seconds before they expire; tokens without an expiry are
+    not cached.
+    """
+
+    def __init__(self, margin: float = 300.0, refresh_ahead: float = 900.0):
+        """
+        Args:
+            margin: seconds before expiry when a token is no longer used
+            refresh_ahead: seconds before expiry when `refresh_async`
+              starts fetching a new token in the background
+        """
+        self.margin = margin
+        self.refresh_ahead = refresh_ahead
+        self.objects = {}
+        self.shared = {}
+        self.refreshing = {}
+        self.lock = Lock()
+
+    def _lookup(self, uuid, scope):
+        """(url, sas, expiry) for an object, from its own entry or from
+        a container-scoped token for its scope, whichever expires
+        last."""
+        candidates = []
+        if uuid in self.objects:
+            candidates.append(self.objects[uuid])
+        if scope is not None and scope in self.shared:
+            baseuri, sas, expiry = self.shared[scope]
+            candidates.append((baseuri + uuid, sas, expiry))
+        if len(candidates) == 0:
+            return None
+        return max(candidates, key=lambda candidate: candidate[2])
+
+    def get(
+        self, uuid: str, scope: Optional[str] = None
+    ) -> Optional[Tuple[str, str]]:
+        """Cached (url, sas) for an object, or None if there is no token
+        that is valid for at least `margin` more seconds."""
+        with self.lock:
+            entry = self._lookup(uuid, scope)
+        if entry is None or entry[2] - time.time() < self.margin:
+            return None
+        return entry[0], entry[1]
+
+    def put(self, uuid: str, url: str, sas: str, scope: Optional[str] = None):
+        """Store the blob url and SAS token for an object. A container
+        scoped token is also stored for the scope."""
+        expiry = _sas_expiry(sas)
+        if expiry is None:
+            return
+        with self.lock:
+            self.objects[uuid] = (url, sas, expiry)
+            if (
+                scope is not None
+                and url.endswith(uuid)
+                and _sas_container_scoped(sas)
+            ):
+                self.shared[scope] = (url[: -len(uuid)], sas, expiry)
+
+    def due(self, uuid: str, scope: Optional[str] = None) -> bool:
+        """True if the token for an object expires within
+        `refresh_ahead` seconds."""
+        with self.lock:
+            entry = self._lookup(uuid, scope)
+        return (
+            entry is not None and entry[2] - time.time() < self.refresh_ahead
+        )
+
+    def refresh_async(self, uuid: str, fetch, scope: Optional[str] = None):
+        """Start fetching a new token for an object in the background,
+        unless a refresh for it is already running. fetch is a
+        coroutine function returning (url, sas). Must be called from a
+        running event loop. A failed refresh is logged; the cached token
+        stays in use until it is too close to expiry."""
+        if uuid in self.refreshing:
+            return
+
+        async def refresh():
+            try:
+                self.put(uuid, *(await fetch()), scope=scope)
+            except Exception:
+                logger.warning(
+                    "Failed to refresh SAS token for %s", uuid, exc_info=True
+                )
+            finally:
+                self.refreshing.pop(uuid, None)
+
+        self.refreshing[uuid] = asyncio.get_running_loop().create_task(
+            refresh()
+        )
+
+    def clear(self):
+        with self.lock:
+            self.objects.clear()
+            self.shared.clear()
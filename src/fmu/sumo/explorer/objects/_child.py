@@ -3,10 +3,18 @@
 from io import BytesIO
 from typing import Dict, List, Tuple, Union
 
+import httpx
 from sumo.wrapper import SumoClient
 
+from fmu.sumo.explorer.cache import SasCache
+
 from ._document import Document
 
+_BLOB_TIMEOUT = 60.0
+
+# SAS credentials for direct blob access, shared by all objects.
+_sas_cache = SasCache()
+
 
 class Child(Document):
     """Class representing a child object in Sumo"""
@@ -51,6 +59,11 @@ class Child(Document):
     def __repr__(self):
         return self.__str__()
 
+    def release(self):
+        """Release the cached blob for this object. It will be fetched
+        again on next use."""
+        self._blob = None
+
     @property
     def blob(self) -> BytesIO:
         """Object blob"""
@@ -69,6 +82,96 @@ class Child(Document):
 
         return self._blob
 
+    def _extract_auth(self, res) -> Tuple[str, str]:
+        try:
+            res = res.json()
+            url = res.get("baseuri") + self.uuid
+            sas = res.get("auth")
+        except Exception:
+            url, sas = res.text.split("?")
+            pass
+        return url, sas
+
+    async def _fetch_auth_async(self) -> Tuple[str, str]:
+        res = await self._sumo.get_async(
+            f"/objects('{self.uuid}')/blob/authuri"
+        )
+        return self._extract_auth(res)
+
+    @property
+    def auth(self) -> Tuple[str, str]:
+        """Blob url and SAS token for direct access to the object blob.
+        Tokens are cached per object until shortly before they expire;
+        a container scoped token is also used for other objects in the
+        same case."""
+        cached = _sas_cache.get(self.uuid, self.caseuuid)
+        if cached is not None:
+            return cached
+        res = self._sumo.get(f"/objects('{self.uuid}')/blob/authuri")
+        url, sas = self._extract_auth(res)
+        _sas_cache.put(self.uuid, url, sas, self.caseuuid)
+        return url, sas
+
+    @property
+    async def auth_async(self) -> Tuple[str, str]:
+        """Blob url and SAS token for direct access to the object blob.
+        A cached token that is about to expire is returned while a new
+        one is fetched in the background."""
+        cached = _sas_cache.get(self.uuid, self.caseuuid)
+        if cached is None:
+            url, sas = await self._fetch_auth_async()
+            _sas_cache.put(self.uuid, url, sas, self.caseuuid)
+            return url, sas
+        if _sas_cache.due(self.uuid, self.caseuuid):
+            _sas_cache.refresh_async(
+                self.uuid, self._fetch_auth_async, self.caseuuid
+            )
+        return cached
+
+    def _read_blob_tail(self, nbytes: int) -> Tuple[bytes, int]:
+        """Read the last nbytes of the object blob with a ranged request
+        directly against blob storage, without downloading the rest.
+
+        Returns:
+            Tuple[bytes, int]: the bytes read, and the size of the blob
+        """
+        url, sas = self.auth
+        url = f"{url}?{sas}"
+        with httpx.Client(timeout=_BLOB_TIMEOUT) as client:
+            size = self.get_property("file.size_bytes")
+            if size is None:
+                res = client.head(url)
+                res.raise_for_status()
+                size = int(res.headers["content-length"])
+            start = max(size - nbytes, 0)
+            res = client.get(
+                url, headers={"Range": f"bytes={start}-{size - 1}"}
+            )
+            res.raise_for_status()
+        return res.content, size
+
+    async def _read_blob_tail_async(self, nbytes: int) -> Tuple[bytes, int]:
+        """Read the last nbytes of the object blob with a ranged request
+        directly against blob storage, without downloading the rest.
+
+        Returns:
+            Tuple[bytes, int]: the bytes read, and the size of the blob
+        """
+        url, sas = await self.auth_async
+        url = f"{url}?{sas}"
+        async with httpx.AsyncClient(timeout=_BLOB_TIMEOUT) as client:
+            size = self.get_property("file.size_bytes")
+            if size is None:
+                res = await client.head(url)
+                res.raise_for_status()
+                size = int(res.headers["content-length"])
+            start = max(size - nbytes, 0)
+            res = await client.get(
+                url, headers={"Range": f"bytes={start}-{size - 1}"}
+            )
+            res.raise_for_status()
+        return res.content, size
+
     @property
     def timestamp(self) -> Union[str, None]:
         """Object timestmap data"""
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
 import math
+import re
 import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
@@ -10,6 +14,29 @@ import httpx
 
 from fmu.sumo.explorer import objects
 from fmu.sumo.explorer.cache import LRUCache
+from fmu.sumo.explorer.objects.polygons import _polygon_rings
+from fmu.sumo.explorer.objects.surface import (
+    _bilinear_weights,
+    _node_coordinates,
+    _rasterize_polygon,
+    _RunningStatistics,
+    _same_geometry,
+    _sample,
+    _zonal_statistics,
+)
+from fmu.sumo.explorer.objects.table import (
+    _align_batch,
+    _arrow_to_pandas,
+    _IpcFileWriter,
+    _label_batch,
+    _merge_collections,
+    _realization_array,
+    _resolve_context_columns,
+    _stack_tables,
+    _widened_schema,
+    _write_ipc_partition,
+)
+from fmu.sumo.explorer.spatial import BBoxIndex
 
 if TYPE_CHECKING:
     from sumo.wrapper import SumoClient
@@ -18,6 +45,9 @@ if TYPE_CHECKING:
 # Type aliases
 SelectArg = Union[bool, str, Dict[str, Union[str, List[str]]], List[str]]
 
+# Max number of blobs downloaded in parallel.
+_MAX_CONCURRENT_DOWNLOADS = 8
+
 
 def _gen_filter_none():
     def _fn(_):
@@ -132,6 +162,29 @@ def _gen_filter_bool(attr):
     return _fn
 
 
+def _gen_filter_bbox():
+    """Match objects whose \"data.bbox\" intersects an area given as
+    (xmin, ymin, xmax, ymax)."""
+
+    def _fn(value):
+        if value is None:
+            return None, None
+        else:
+            xmin, ymin, xmax, ymax = value
+            return {
+                "bool": {
+                    "filter": [
+                        {"range": {"data.bbox.xmin": {"lte": xmax}}},
+                        {"range": {"data.bbox.xmax": {"gte": xmin}}},
+                        {"range": {"data.bbox.ymin": {"lte": ymax}}},
+                        {"range": {"data.bbox.ymax": {"gte": ymin}}},
+                    ]
+                }
+            }, None
+
+    return _fn
+
+
 def _gen_filter_complex():
     """Match against user-supplied query, which is a structured
     Elasticsearch query in dictionary form."""
@@ -170,6 +223,7 @@ _filterspec = {
     "is_prediction": [_gen_filter_bool, "data.is_prediction"],
     "standard_result": [_gen_filter_gen, "data.standard_result.name.keyword"],
     "entity": [_gen_filter_gen, "fmu.entity.uuid.keyword"],
+    "bbox": [_gen_filter_bbox, None],
     "complex": [_gen_filter_complex, None],
     "has": [_gen_filter_none, None],
 }
@@ -292,6 +346,53 @@ def _set_search_after(query, after):
     return query
 
 
+def _referenced_names(query, names):
+    """Names from names that occur as identifiers in an SQL query."""
+    return [
+        name
+        for name in names
+        if re.search(rf"(?<![\w.]){re.escape(name)}(?!\w)", query)
+    ]
+
+
+def _newest_collections(hits, patterns):
+    """Pick the newest collection aggregation for each column matching
+    patterns (column names or regular expressions).
+
+    Returns a list of (hit, column) pairs, ordered by the first pattern
+    each column matches, and the key columns shared by all the picked
+    collections.
+    """
+
+    def rank(column):
+        for i, pattern in enumerate(patterns):
+            if column == pattern or re.fullmatch(pattern, column):
+                return i
+        return None
+
+    hits = sorted(
+        hits,
+        key=lambda hit: hit["_source"]["_sumo"]["timestamp"],
+        reverse=True,
+    )
+    specs = [hit["_source"]["data"]["spec"]["columns"] for hit in hits]
+    shared = set.intersection(*map(set, specs)) if len(specs) > 0 else set()
+    newest = {}
+    for hit, spec in zip(hits, specs):
+        matched = [c for c in spec if rank(c) is not None]
+        # Key columns like DATE occur in every collection; they only
+        # count as the aggregated column if nothing else matched.
+        for column in [c for c in matched if c not in shared] or matched:
+            newest.setdefault(column, (hit, spec))
+    picked = sorted(newest.items(), key=lambda kv: (rank(kv[0]), kv[0]))
+    keys = [
+        c
+        for c in (picked[0][1][1] if len(picked) > 0 else [])
+        if c not in newest and all(c in spec for _, (_, spec) in picked)
+    ]
+    return [(hit, column) for column, (hit, _) in picked], keys
+
+
 class Pit:
     def __init__(self, sumo: SumoClient, keepalive="5m"):
         self._sumo = sumo
@@ -351,6 +452,7 @@ class SearchContext:
         self._hits = None
         self._cache = LRUCache(capacity=200)
         self._length = None
+        self._bbox_index = None
         self._select: SelectArg = {
             "excludes": ["fmu.realization.parameters"],
         }
@@ -686,6 +788,7 @@ class SearchContext:
         self._limit = n
         self._length = None
         self._hits = None
+        self._bbox_index = None
         return self
 
     def get_object(self, uuid: str) -> objects.Document:
@@ -1662,6 +1765,533 @@ class SearchContext:
         """
         return await self._get_object_by_class_and_uuid_async("table", uuid)
 
+    @staticmethod
+    def _bbox_entries(hits):
+        keys, bboxes = [], []
+        for hit in hits:
+            bbox = hit["_source"].get("data", {}).get("bbox") or {}
+            corners = [bbox.get(k) for k in ("xmin", "ymin", "xmax", "ymax")]
+            if None not in corners:
+                keys.append(hit["_id"])
+                bboxes.append(corners)
+        return keys, bboxes
+
+    def bbox_index(self) -> BBoxIndex:
+        """Spatial index over data.bbox of the objects in the current
+        context, for repeated area lookups without new searches.
+
+        The bounding boxes are fetched with a single projected search
+        and the index is kept with the context. Objects without a
+        bounding box are left out.
+
+        Returns:
+            BBoxIndex: an R-tree keyed by object uuid
+        """
+        if self._bbox_index is None:
+            hits = self._search_all(select=["data.bbox"])
+            self._bbox_index = BBoxIndex(*self._bbox_entries(hits))
+        return self._bbox_index
+
+    async def bbox_index_async(self) -> BBoxIndex:
+        """Spatial index over data.bbox of the objects in the current
+        context; see `bbox_index`.
+
+        Returns:
+            BBoxIndex: an R-tree keyed by object uuid
+        """
+        if self._bbox_index is None:
+            hits = await self._search_all_async(select=["data.bbox"])
+            self._bbox_index = BBoxIndex(*self._bbox_entries(hits))
+        return self._bbox_index
+
+    def _objects_of_class(self, hits, cls) -> List[objects.Child]:
+        objs = [self._to_sumo(hit) for hit in hits]
+        for obj in objs:
+            if not isinstance(obj, cls):
+                raise Exception(
+                    f"Expected only {cls.__name__.lower()} objects; "
+                    f"found {obj.classname}"
+                )
+        return objs
+
+    def _table_objects(self, hits) -> List[objects.Table]:
+        return self._objects_of_class(hits, objects.Table)
+
+    def _fetch_tables(self, columns=None, filter=None):
+        tables = self._table_objects(self._search_all(select=self._select))
+        return tables, self._download_tables(tables, columns, filter)
+
+    async def _fetch_tables_async(self, columns=None, filter=None):
+        tables = self._table_objects(
+            await self._search_all_async(select=self._select)
+        )
+        return tables, await self._download_tables_async(
+            tables, columns, filter
+        )
+
+    @staticmethod
+    def _download_tables(tables, columns=None, filter=None):
+        # columns may also be a function giving the columns per table.
+        def fetch(table):
+            arrowtable = table.to_arrow(
+                columns(table) if callable(columns) else columns, filter
+            )
+            table.release()
+            return arrowtable
+
+        with ThreadPoolExecutor(_MAX_CONCURRENT_DOWNLOADS) as executor:
+            return list(executor.map(fetch, tables))
+
+    @staticmethod
+    async def _download_tables_async(tables, columns=None, filter=None):
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_DOWNLOADS)
+
+        async def fetch(table):
+            async with semaphore:
+                arrowtable = await table.to_arrow_async(
+                    columns(table) if callable(columns) else columns, filter
+                )
+            table.release()
+            return arrowtable
+
+        return await asyncio.gather(*[fetch(t) for t in tables])
+
+    def to_arrow(self, columns=None, filter=None):
+        """Download all tables in the current context and stack them into
+        one arrow table. Tables are downloaded and decoded concurrently.
+
+        ENSEMBLE and REAL columns are added from the object metadata,
+        unless the tables already have such columns. Columns missing
+        from some tables are filled with nulls.
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names; see `Table.to_arrow`.
+            filter (pc.Expression | List[Tuple]): row filter; see
+              `Table.to_arrow`.
+
+        Returns:
+            pa.Table: the stacked tables
+
+        Examples:
+            Stack FOPT for all realizations in an ensemble::
+
+                tables = ensemble.tables.filter(
+                    name="summary", realization=True
+                )
+                fopt = tables.to_arrow(columns=["DATE", "FOPT"])
+        """
+        return _stack_tables(*self._fetch_tables(columns, filter))
+
+    async def to_arrow_async(self, columns=None, filter=None):
+        """Download all tables in the current context and stack them into
+        one arrow table. Tables are downloaded concurrently.
+
+        ENSEMBLE and REAL columns are added from the object metadata,
+        unless the tables already have such columns. Columns missing
+        from some tables are filled with nulls.
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names; see `Table.to_arrow`.
+            filter (pc.Expression | List[Tuple]): row filter; see
+              `Table.to_arrow`.
+
+        Returns:
+            pa.Table: the stacked tables
+        """
+        return _stack_tables(
+            *(await self._fetch_tables_async(columns, filter))
+        )
+
+    def to_pandas(self, columns=None, filter=None, dtype_backend=None):
+        """Download all tables in the current context and stack them into
+        one pandas DataFrame; see `to_arrow`.
+
+        Returns:
+            DataFrame: the stacked tables
+        """
+        return _arrow_to_pandas(self.to_arrow(columns, filter), dtype_backend)
+
+    async def to_pandas_async(
+        self, columns=None, filter=None, dtype_backend=None
+    ):
+        """Download all tables in the current context and stack them into
+        one pandas DataFrame; see `to_arrow_async`.
+
+        Returns:
+            DataFrame: the stacked tables
+        """
+        return _arrow_to_pandas(
+            await self.to_arrow_async(columns, filter), dtype_backend
+        )
+
+    @staticmethod
+    def _index_projection(columns, index):
+        # Project each table on the index and those of columns it has.
+        def projection(table):
+            available = set(table.columns or [])
+            return [index] + [c for c in columns if c in available]
+
+        return projection
+
+    def to_numpy(self, columns=None, index="DATE"):
+        """Download all tables in the current context, one per
+        realization, and align them on an index column in a dense
+        realization x index x column array.
+
+        Tables are downloaded concurrently, projected on the requested
+        columns. The column axis is resolved from data.spec.columns and
+        the array is allocated once, so no intermediate tables are
+        concatenated. Entries missing from a realization are masked.
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names; all columns by default.
+            index (str): name of the column to align on.
+
+        Returns:
+            Tuple[np.ma.MaskedArray, Dict[str, np.ndarray]]: the array
+            and its coordinates; the keys are "REAL", index and
+            "column", in axis order.
+
+        Examples:
+            Field rates for all realizations::
+
+                tables = ensemble.tables.filter(
+                    name="summary", realization=True
+                )
+                values, coords = tables.to_numpy(["FOPR", "FWPR"])
+                mean_fopr = values[:, :, 0].mean(axis=0)
+        """
+        tables = self._table_objects(self._search_all(select=self._select))
+        names = _resolve_context_columns(tables, columns, index)
+        arrowtables = self._download_tables(
+            tables, self._index_projection(names, index)
+        )
+        return _realization_array(tables, arrowtables, names, index)
+
+    async def to_numpy_async(self, columns=None, index="DATE"):
+        """Download all tables in the current context, one per
+        realization, and align them on an index column in a dense
+        realization x index x column array; see `to_numpy`.
+
+        Returns:
+            Tuple[np.ma.MaskedArray, Dict[str, np.ndarray]]: the array
+            and its coordinates.
+        """
+        tables = self._table_objects(
+            await self._search_all_async(select=self._select)
+        )
+        names = _resolve_context_columns(tables, columns, index)
+        arrowtables = await self._download_tables_async(
+            tables, self._index_projection(names, index)
+        )
+        return _realization_array(tables, arrowtables, names, index)
+
+    def to_xarray(self, columns=None, index="DATE"):
+        """Download all tables in the current context as an
+        xarray.DataArray with dimensions REAL, index and column; see
+        `to_numpy`. Masked entries are NaN.
+
+        Returns:
+            xr.DataArray: the aligned tables
+        """
+        try:
+            import xarray as xr
+        except ModuleNotFoundError:
+            raise RuntimeError(
+                "Unable to import xarray; probably not installed."
+            )
+        values, coords = self.to_numpy(columns, index)
+        return xr.DataArray(
+            values.filled(float("nan")), coords=coords, dims=list(coords)
+        )
+
+    async def to_xarray_async(self, columns=None, index="DATE"):
+        """Download all tables in the current context as an
+        xarray.DataArray; see `to_xarray`.
+
+        Returns:
+            xr.DataArray: the aligned tables
+        """
+        try:
+            import xarray as xr
+        except ModuleNotFoundError:
+            raise RuntimeError(
+                "Unable to import xarray; probably not installed."
+            )
+        values, coords = await self.to_numpy_async(columns, index)
+        return xr.DataArray(
+            values.filled(float("nan")), coords=coords, dims=list(coords)
+        )
+
+    @staticmethod
+    def _iter_completed(items, fetch):
+        """Apply fetch to items in a thread pool, yielding the results in
+        the order they complete. At most _MAX_CONCURRENT_DOWNLOADS items
+        are in flight at any time."""
+        items = iter(items)
+        with ThreadPoolExecutor(_MAX_CONCURRENT_DOWNLOADS) as executor:
+            pending = {
+                executor.submit(fetch, item)
+                for item in itertools.islice(items, _MAX_CONCURRENT_DOWNLOADS)
+            }
+            while len(pending) > 0:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    item = next(items, None)
+                    if item is not None:
+                        pending.add(executor.submit(fetch, item))
+
+    @staticmethod
+    async def _iter_completed_async(items, fetch):
+        """Await the coroutine function fetch for items concurrently,
+        yielding the results in the order they complete."""
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_DOWNLOADS)
+
+        async def bounded(item):
+            async with semaphore:
+                return await fetch(item)
+
+        for coro in asyncio.as_completed([bounded(item) for item in items]):
+            yield await coro
+
+    def _iter_fetched_tables(self, columns=None, filter=None):
+        """Download and decode the tables in the current context
+        concurrently, yielding (Table, pa.Table) pairs in the order they
+        complete."""
+        tables = self._table_objects(self._search_all(select=self._select))
+
+        def fetch(table):
+            arrowtable = table.to_arrow(columns, filter)
+            table.release()
+            return table, arrowtable
+
+        return self._iter_completed(tables, fetch)
+
+    async def _iter_fetched_tables_async(self, columns=None, filter=None):
+        """Download the tables in the current context concurrently,
+        yielding (Table, pa.Table) pairs in the order they complete."""
+        tables = self._table_objects(
+            await self._search_all_async(select=self._select)
+        )
+
+        async def fetch(table):
+            arrowtable = await table.to_arrow_async(columns, filter)
+            table.release()
+            return table, arrowtable
+
+        async for result in self._iter_completed_async(tables, fetch):
+            yield result
+
+    def to_arrow_ipc(self, path, columns=None, filter=None, partitioned=False):
+        """Export all tables in the current context to local Arrow IPC
+        (feather v2) files, which other processes can memory-map without
+        parsing or downloading the data again. Tables are written as
+        their downloads complete.
+
+        By default all tables are written to a single file at `path`,
+        stacked and labelled with ENSEMBLE and REAL columns as by
+        `to_arrow`. The schema is set up from the first table written,
+        with integer columns other than REAL written as float64, so that
+        the result does not depend on which table arrives first; a
+        column that does not fit, e.g. text in a numeric column, raises
+        ValueError.
+
+        If `partitioned` is True, `path` is a directory, and each table
+        is written to its own file in a hive style layout
+        path/ENSEMBLE=<name>/REAL=<id>/<uuid>.arrow, with integer columns
+        also written as float64.
+
+        Args:
+            path (str | Path): output file or directory
+            columns (str | List[str]): column names or regular
+              expressions for column names; see `Table.to_arrow`.
+            filter (pc.Expression | List[Tuple]): row filter; see
+              `Table.to_arrow`.
+            partitioned (bool): write one file per table
+
+        Examples:
+            Export, and read back memory-mapped::
+
+                tables.to_arrow_ipc("summary.arrow")
+                with pa.memory_map("summary.arrow") as source:
+                    summary = pa.ipc.open_file(source).read_all()
+
+            Export partitioned, and read back as a dataset::
+
+                tables.to_arrow_ipc("summary", partitioned=True)
+                dataset = pyarrow.dataset.dataset(
+                    "summary", format="ipc", partitioning="hive"
+                )
+        """
+        fetched = self._iter_fetched_tables(columns, filter)
+        if partitioned:
+            for table, arrowtable in fetched:
+                _write_ipc_partition(path, table, arrowtable)
+            return
+        writer = _IpcFileWriter(path)
+        try:
+            for table, arrowtable in fetched:
+                writer.write(table, arrowtable)
+        finally:
+            writer.close()
+
+    async def to_arrow_ipc_async(
+        self, path, columns=None, filter=None, partitioned=False
+    ):
+        """Export all tables in the current context to local Arrow IPC
+        files; see `to_arrow_ipc`."""
+        fetched = self._iter_fetched_tables_async(columns, filter)
+        if partitioned:
+            async for table, arrowtable in fetched:
+                _write_ipc_partition(path, table, arrowtable)
+            return
+        writer = _IpcFileWriter(path)
+        try:
+            async for table, arrowtable in fetched:
+                writer.write(table, arrowtable)
+        finally:
+            writer.close()
+
+    def iter_batches(self, batch_size=65536, columns=None):
+        """Iterate over all tables in the current context as arrow record
+        batches, labelled with ENSEMBLE and REAL columns. Only one table
+        is held in memory at a time; the blob for the next table is
+        downloaded while the batches of the current one are consumed.
+
+        Args:
+            batch_size (int): max number of rows per batch
+            columns (str | List[str]): column names or regular
+              expressions for column names; see `Table.to_arrow`.
+
+        Yields:
+            pa.RecordBatch: batches from each of the tables in turn
+        """
+        tables = self._table_objects(self._search_all(select=self._select))
+        if len(tables) == 0:
+            return
+        with ThreadPoolExecutor(1) as executor:
+            pending = executor.submit(lambda t: t.blob, tables[0])
+            for index, table in enumerate(tables):
+                pending.result()
+                if index + 1 < len(tables):
+                    pending = executor.submit(
+                        lambda t: t.blob, tables[index + 1]
+                    )
+                for batch in table.iter_batches(batch_size, columns):
+                    yield _label_batch(table, batch)
+                table.release()
+
+    async def iter_batches_async(self, batch_size=65536, columns=None):
+        """Iterate over all tables in the current context as arrow record
+        batches; see `iter_batches`.
+
+        Yields:
+            pa.RecordBatch: batches from each of the tables in turn
+        """
+        tables = self._table_objects(
+            await self._search_all_async(select=self._select)
+        )
+        if len(tables) == 0:
+            return
+        pending = asyncio.ensure_future(tables[0].blob_async)
+        for index, table in enumerate(tables):
+            await pending
+            if index + 1 < len(tables):
+                pending = asyncio.ensure_future(tables[index + 1].blob_async)
+            for batch in table.iter_batches(batch_size, columns):
+                yield _label_batch(table, batch)
+            table.release()
+
+    def to_batch_reader(self, batch_size=65536, columns=None):
+        """Return a record batch reader that streams all tables in the
+        current context; see `iter_batches`.
+
+        The schema of the reader is set up from the first table, with
+        integer columns other than REAL as float64, so that later tables
+        with decimals in the same column fit. Columns that are missing
+        from later tables are filled with nulls, and columns that are not
+        in the first table are dropped; use `columns` to make the schema
+        explicit. A column that does not fit the schema raises
+        ValueError.
+
+        Returns:
+            pa.RecordBatchReader: a reader over the batches
+        """
+        import pyarrow as pa
+
+        batches = self.iter_batches(batch_size, columns)
+        first = next(batches, None)
+        if first is None:
+            return pa.RecordBatchReader.from_batches(pa.schema([]), [])
+        schema = _widened_schema(first.schema)
+
+        def aligned():
+            yield _align_batch(first, schema)
+            for batch in batches:
+                yield _align_batch(batch, schema)
+
+        return pa.RecordBatchReader.from_batches(schema, aligned())
+
+    def sql(self, query: str, con=None):
+        """Run an SQL query with DuckDB against the tables in the current
+        context.
+
+        Each table name (data.name) in the context that occurs in the
+        query is registered as a view of all objects with that name,
+        stacked as by `to_arrow` (so including ENSEMBLE and REAL
+        columns). Only tables that are referenced in the query are
+        downloaded, and DuckDB scans the arrow data without copying it.
+
+        Args:
+            query (str): the SQL query
+            con (duckdb.DuckDBPyConnection): connection to register the
+              views in; by default a new in-memory connection is used.
+
+        Returns:
+            pa.Table: the query result
+
+        Examples:
+            Mean field oil production total per date::
+
+                tables = ensemble.tables.filter(realization=True)
+                tables.sql(
+                    "SELECT DATE, avg(FOPT) FROM summary "
+                    "GROUP BY DATE ORDER BY DATE"
+                )
+        """
+        try:
+            import duckdb
+        except ModuleNotFoundError:
+            raise RuntimeError(
+                "Unable to import duckdb; probably not installed."
+            )
+        con = duckdb.connect() if con is None else con
+        for name in _referenced_names(query, self.names):
+            con.register(name, self.filter(name=name).to_arrow())
+        return con.sql(query).to_arrow_table()
+
+    async def sql_async(self, query: str, con=None):
+        """Run an SQL query with DuckDB against the tables in the current
+        context; see `sql`.
+
+        Returns:
+            pa.Table: the query result
+        """
+        try:
+            import duckdb
+        except ModuleNotFoundError:
+            raise RuntimeError(
+                "Unable to import duckdb; probably not installed."
+            )
+        con = duckdb.connect() if con is None else con
+        for name in _referenced_names(query, await self.names_async):
+            con.register(name, await self.filter(name=name).to_arrow_async())
+        return con.sql(query).to_arrow_table()
+
     def __prepare_verify_aggregation_query(self) -> Dict:
         return {
             "query": self._query,
@@ -1818,9 +2448,7 @@ class SearchContext:
         assert len(columns) < 1000, (
             "Maximum 1000 columns allowed for a single call to batch_aggregate."
         )
-        sc = self.filter(realization=True, column=columns)
-        if len(sc.hidden) > 0:
-            sc = sc.hidden
+        sc = self._batch_source(columns)
         res = sc._aggregate(columns=columns, operation=operation, no_wait=True)
         assert type(res) is httpx.Response
         if no_wait:
@@ -1917,10 +2545,7 @@ class SearchContext:
         assert len(columns) < 1000, (
             "Maximum 1000 columns allowed for a single call to batch_aggregate_async."
         )
-        sc = self.filter(realization=True, column=columns)
-        length_hidden = await sc.hidden.length_async()
-        if length_hidden > 0:
-            sc = sc.hidden
+        sc = await self._batch_source_async(columns)
         res = await sc._aggregate_async(
             columns=columns, operation=operation, no_wait=True
         )
@@ -1930,6 +2555,778 @@ class SearchContext:
         # ELSE
         return await self._sumo.poll_async(res)
 
+    def _batch_source(self, columns):
+        """The realization objects `batch_aggregate` aggregates."""
+        sc = self.filter(realization=True, column=columns)
+        if len(sc.hidden) > 0:
+            sc = sc.hidden
+        return sc
+
+    async def _batch_source_async(self, columns):
+        sc = self.filter(realization=True, column=columns)
+        if await sc.hidden.length_async() > 0:
+            sc = sc.hidden
+        return sc
+
+    def _collection_context(self, source, columns):
+        """Collection aggregations made from the case, entity and
+        ensemble in source, as returned by
+        `_verify_aggregation_operation`. The search starts from scratch,
+        since aggregations have no realization and would not match a
+        context filtered on realizations."""
+        caseuuid, classname, entityuuid, ensemblename, _ = source
+        sc = SearchContext(self._sumo).filter(
+            uuid=caseuuid,
+            cls=classname,
+            entity=entityuuid,
+            ensemble=ensemblename,
+            aggregation="collection",
+        )
+        if all(re.escape(column) == column for column in columns):
+            # Plain column names can be filtered on server side.
+            sc = sc.filter(column=columns)
+        return sc
+
+    def _collection_tables(self, hits, columns):
+        picked, keys = _newest_collections(hits, columns)
+        if len(picked) == 0:
+            raise Exception(
+                f"No collection aggregations found for columns {columns}"
+            )
+        unique = {hit["_id"]: hit for hit, _ in picked}
+        tables = self._table_objects(list(unique.values()))
+        index = {table.uuid: i for i, table in enumerate(tables)}
+        return (
+            tables,
+            [index[hit["_id"]] for hit, _ in picked],
+            [column for _, column in picked],
+            keys,
+        )
+
+    def batch_aggregation_to_arrow(self, columns):
+        """Merge the collection aggregations made by `batch_aggregate` into
+        one arrow table.
+
+        The case, entity and ensemble are resolved from the current
+        context the same way `batch_aggregate` resolves them, so only
+        collections made from the same source objects are used, even if
+        the context is filtered on realizations. The newest collection
+        for each matching column is then found with a single search, the
+        collections are downloaded concurrently, and the result has the
+        shared key columns (e.g. DATE and REAL) followed by one column
+        per aggregated column.
+
+        Args:
+            columns: list of column names or regular expressions for
+              column names, as passed to `batch_aggregate`.
+
+        Returns:
+            pa.Table: the merged collections
+
+        Examples:
+            Aggregate a few vectors, then slice them out on the client::
+
+                tables = ensemble.tables.filter(name="summary")
+                tables.batch_aggregate(
+                    columns=["FOPT", "FGPT"], operation="collection"
+                )
+                arrowtable = tables.batch_aggregation_to_arrow(
+                    ["FOPT", "FGPT"]
+                )
+        """
+        assert type(columns) is list and len(columns) > 0
+        source = self._batch_source(columns)
+        sc = self._collection_context(
+            source._verify_aggregation_operation(columns), columns
+        )
+        tables, positions, names, keys = self._collection_tables(
+            sc._search_all(select=sc._select), columns
+        )
+        arrowtables = self._download_tables(tables)
+        return _merge_collections(
+            [arrowtables[i] for i in positions], names, keys
+        )
+
+    async def batch_aggregation_to_arrow_async(self, columns):
+        """Merge the collection aggregations made by `batch_aggregate` into
+        one arrow table; see `batch_aggregation_to_arrow`.
+
+        Returns:
+            pa.Table: the merged collections
+        """
+        assert type(columns) is list and len(columns) > 0
+        source = await self._batch_source_async(columns)
+        sc = self._collection_context(
+            await source._verify_aggregation_operation_async(columns), columns
+        )
+        tables, positions, names, keys = self._collection_tables(
+            await sc._search_all_async(select=sc._select), columns
+        )
+        arrowtables = await self._download_tables_async(tables)
+        return _merge_collections(
+            [arrowtables[i] for i in positions], names, keys
+        )
+
+    def _local_statistics(self, hits, operation):
+        operations = [operation] if isinstance(operation, str) else operation
+        surfaces = self._objects_of_class(hits, objects.Surface)
+        if len(surfaces) == 0:
+            raise Exception("No surfaces to aggregate.")
+        return surfaces, _RunningStatistics(operations)
+
+    @staticmethod
+    def _local_geometry(expected, geometry):
+        """The geometry shared by the aggregated surfaces so far."""
+        if expected is not None and not _same_geometry(expected, geometry):
+            raise ValueError(
+                "Surfaces have different geometries: "
+                f"{expected} and {geometry}; aggregate surfaces on one "
+                "grid at a time."
+            )
+        return geometry
+
+    @staticmethod
+    def _local_results(statistics, geometry, operation):
+        try:
+            from xtgeo import RegularSurface
+        except ModuleNotFoundError:
+            raise RuntimeError(
+                "Unable to import xtgeo; probably not installed."
+            )
+
+        def result(op):
+            return RegularSurface(**geometry, values=statistics.result(op))
+
+        if isinstance(operation, str):
+            return result(operation)
+        return {op: result(op) for op in operation}
+
+    def aggregate_locally(self, operation="mean"):
+        """Compute ensemble statistics for the surfaces in the current
+        context on the client, without an aggregation job.
+
+        Surfaces are downloaded concurrently, decoded with
+        `Surface.to_numpy` and folded into running statistics one at a
+        time, so memory use is proportional to the grid size, not to the
+        number of realizations. Mean, std, min and max are exact.
+        Quantiles ("p10", "p50", ...) are exact for up to 16 surfaces;
+        beyond that they are approximated from a histogram per node,
+        whose range is set from the spread of the first 16 surfaces at
+        that node. The standard deviation is the population standard
+        deviation. All surfaces must share one grid geometry; a
+        ValueError is raised otherwise.
+
+        Args:
+            operation (str | List[str]): one or more of "mean", "std",
+              "min", "max" or "pNN" for a quantile.
+
+        Returns:
+            RegularSurface | Dict[str, RegularSurface]: the statistic,
+            or a mapping from operation to statistic if operation is a
+            list.
+
+        Examples:
+            Mean and P90 surface of a few realizations::
+
+                surfs = ensemble.surfaces.filter(
+                    name="TopVolantis", realization=[0, 1, 2, 3]
+                )
+                stats = surfs.aggregate_locally(["mean", "p90"])
+        """
+        surfaces, statistics = self._local_statistics(
+            self._search_all(select=self._select), operation
+        )
+
+        def fetch(surface):
+            values = surface.to_numpy()
+            geometry = surface.geometry
+            surface.release()
+            return geometry, values
+
+        expected = None
+        for geometry, values in self._iter_completed(surfaces, fetch):
+            expected = self._local_geometry(expected, geometry)
+            statistics.add(values)
+        return self._local_results(statistics, expected, operation)
+
+    async def aggregate_locally_async(self, operation="mean"):
+        """Compute ensemble statistics for the surfaces in the current
+        context on the client; see `aggregate_locally`.
+
+        Returns:
+            RegularSurface | Dict[str, RegularSurface]: the statistic(s)
+        """
+        surfaces, statistics = self._local_statistics(
+            await self._search_all_async(select=self._select), operation
+        )
+
+        async def fetch(surface):
+            values = await surface.to_numpy_async()
+            geometry = surface.geometry
+            surface.release()
+            return geometry, values
+
+        expected = None
+        async for geometry, values in self._iter_completed_async(
+            surfaces, fetch
+        ):
+            expected = self._local_geometry(expected, geometry)
+            statistics.add(values)
+        return self._local_results(statistics, expected, operation)
+
+    def _point_sampler(self, hits, xy):
+        import numpy as np
+
+        surfaces = self._objects_of_class(hits, objects.Surface)
+        realizations = [surface.realization for surface in surfaces]
+        if None in realizations or len(set(realizations)) != len(surfaces):
+            raise ValueError("Expected exactly one surface per realization.")
+        realizations = sorted(realizations)
+        rows = {real: row for row, real in enumerate(realizations)}
+        npoints = np.asarray(xy).reshape(-1, 2).shape[0]
+        result = np.ma.masked_all((len(surfaces), npoints))
+        weights = {}
+
+        def sample(surface, geometry, values):
+            # Surfaces in an ensemble normally share one geometry, so the
+            # interpolation weights are computed once per geometry.
+            key = tuple(sorted(geometry.items()))
+            if key not in weights:
+                weights[key] = _bilinear_weights(geometry, xy)
+            result[rows[surface.realization]] = _sample(values, *weights[key])
+
+        coords = {
+            "REAL": np.asarray(realizations),
+            "point": np.arange(npoints),
+        }
+        return surfaces, sample, result, coords
+
+    def sample_points(self, xy):
+        """Sample the surfaces in the current context, one per
+        realization, at a set of points.
+
+        Surfaces are downloaded concurrently and decoded with
+        `Surface.to_numpy`; each grid is interpolated bilinearly and
+        dropped, so only a few grids are held in memory at a time.
+        Points outside a surface, or next to undefined nodes, are
+        masked.
+
+        Args:
+            xy: array-like of shape (npoints, 2) with x and y
+              coordinates.
+
+        Returns:
+            Tuple[np.ma.MaskedArray, Dict[str, np.ndarray]]: a
+            realization x point array, and its coordinates ("REAL" and
+            "point", in axis order).
+
+        Examples:
+            Depth of a horizon along a planned well path::
+
+                surfs = ensemble.surfaces.filter(
+                    name="TopVolantis", tagname="DS_extract_geogrid"
+                )
+                depths, coords = surfs.sample_points(well_xy)
+        """
+        surfaces, sample, result, coords = self._point_sampler(
+            self._search_all(select=self._select), xy
+        )
+
+        def fetch(surface):
+            sample(surface, surface.geometry, surface.to_numpy())
+            surface.release()
+
+        for _ in self._iter_completed(surfaces, fetch):
+            pass
+        return result, coords
+
+    async def sample_points_async(self, xy):
+        """Sample the surfaces in the current context, one per
+        realization, at a set of points; see `sample_points`.
+
+        Returns:
+            Tuple[np.ma.MaskedArray, Dict[str, np.ndarray]]: a
+            realization x point array, and its coordinates.
+        """
+        surfaces, sample, result, coords = self._point_sampler(
+            await self._search_all_async(select=self._select), xy
+        )
+
+        async def fetch(surface):
+            values = await surface.to_numpy_async()
+            sample(surface, surface.geometry, values)
+            surface.release()
+
+        async for _ in self._iter_completed_async(surfaces, fetch):
+            pass
+        return result, coords
+
+    def _polygon_objects(self, polygons) -> List[objects.Polygons]:
+        if isinstance(polygons, objects.Polygons):
+            return [polygons]
+        return polygons._objects_of_class(
+            polygons._search_all(select=polygons._select), objects.Polygons
+        )
+
+    @staticmethod
+    def _zones(polygons, dataframes):
+        return [
+            (polygon.name, ident, ring)
+            for polygon, dataframe in zip(polygons, dataframes)
+            for ident, ring in _polygon_rings(dataframe)
+        ]
+
+    def _zonal_reducer(self, hits, zones):
+        surfaces = self._objects_of_class(hits, objects.Surface)
+        cells = {}
+
+        def reduce(surface, geometry, values):
+            # The zones are rasterized once per grid geometry and reused
+            # for every realization on that grid.
+            key = tuple(sorted(geometry.items()))
+            if key not in cells:
+                x, y = _node_coordinates(geometry)
+                cells[key] = [
+                    _rasterize_polygon(x, y, ring) for _, _, ring in zones
+                ]
+            return surface.realization, _zonal_statistics(values, cells[key])
+
+        return surfaces, reduce
+
+    @staticmethod
+    def _zonal_table(results, zones):
+        import pyarrow as pa
+
+        results = sorted(results, key=lambda result: result[0])
+        rows = [
+            (real, name, ident, *stats)
+            for real, statistics in results
+            for (name, ident, _), stats in zip(zones, statistics)
+        ]
+        names = ["REAL", "POLYGONS", "POLY_ID"]
+        names += ["COUNT", "MEAN", "STD", "MIN", "MAX"]
+        return pa.table(
+            {name: list(column) for name, column in zip(names, zip(*rows))}
+            if len(rows) > 0
+            else {name: [] for name in names}
+        )
+
+    def zonal_statistics(self, polygons):
+        """Statistics of the surfaces in the current context inside the
+        polygons of one or more Polygons objects.
+
+        Every polygon (POLY_ID) in every Polygons object is a zone. The
+        zones are rasterized once per grid geometry by testing which
+        surface nodes lie inside them, and the resulting node sets are
+        reused for all realizations. Surfaces are downloaded
+        concurrently and decoded with `Surface.to_numpy`.
+
+        Args:
+            polygons (Polygons | SearchContext): a Polygons object, or a
+              context of Polygons objects.
+
+        Returns:
+            pa.Table: one row per realization and zone, with columns
+            REAL, POLYGONS (the name of the Polygons object), POLY_ID,
+            COUNT (the number of defined nodes), MEAN, STD, MIN and MAX.
+
+        Examples:
+            Mean depth of a horizon within license outlines::
+
+                outlines = case.polygons.filter(tagname="license")
+                surfs = ensemble.surfaces.filter(
+                    name="TopVolantis", tagname="DS_extract_geogrid"
+                )
+                stats = surfs.zonal_statistics(outlines).to_pandas()
+        """
+        polygons = self._polygon_objects(polygons)
+        zones = self._zones(polygons, [p.to_pandas() for p in polygons])
+        surfaces, reduce = self._zonal_reducer(
+            self._search_all(select=self._select), zones
+        )
+
+        def fetch(surface):
+            result = reduce(surface, surface.geometry, surface.to_numpy())
+            surface.release()
+            return result
+
+        return self._zonal_table(
+            list(self._iter_completed(surfaces, fetch)), zones
+        )
+
+    async def zonal_statistics_async(self, polygons):
+        """Statistics of the surfaces in the current context inside the
+        polygons of one or more Polygons objects; see
+        `zonal_statistics`.
+
+        Returns:
+            pa.Table: one row per realization and zone
+        """
+        if isinstance(polygons, objects.Polygons):
+            polygons = [polygons]
+        else:
+            polygons = polygons._objects_of_class(
+                await polygons._search_all_async(select=polygons._select),
+                objects.Polygons,
+            )
+        zones = self._zones(
+            polygons, [await p.to_pandas_async() for p in polygons]
+        )
+        surfaces, reduce = self._zonal_reducer(
+            await self._search_all_async(select=self._select), zones
+        )
+
+        async def fetch(surface):
+            values = await surface.to_numpy_async()
+            result = reduce(surface, surface.geometry, values)
+            surface.release()
+            return result
+
+        results = [
+            result
+            async for result in self._iter_completed_async(surfaces, fetch)
+        ]
+        return self._zonal_table(results, zones)
+
+    def _grid_context(self, props) -> Optional[SearchContext]:
+        """Context with the grids of a list of grid properties.
+
+        A property is linked to the grid in the same case, ensemble and
+        realization whose file.relative_path is the property's
+        data.geometry.relative_path, or else whose name is the
+        property's tagname; see `_match_grids`.
+        """
+        paths = {
+            prop.get_property("data.geometry.relative_path") for prop in props
+        } - {None}
+        tagnames = {prop.tagname for prop in props} - {None}
+        should = []
+        if len(paths) > 0:
+            should.append(
+                {"terms": {"file.relative_path.keyword": sorted(paths)}}
+            )
+        if len(tagnames) > 0:
+            should.append({"terms": {"data.name.keyword": sorted(tagnames)}})
+        if len(should) == 0:
+            return None
+        sc = SearchContext(self._sumo).grids.filter(
+            uuid=sorted({prop.caseuuid for prop in props}),
+            complex={"bool": {"minimum_should_match": 1, "should": should}},
+        )
+        # Narrow the search on server side where every property has a
+        # value; the exact pairing is done in _match_grids.
+        ensembles = {prop.ensemble for prop in props}
+        if None not in ensembles:
+            sc = sc.filter(ensemble=sorted(ensembles))
+        realizations = {prop.realization for prop in props}
+        if None not in realizations:
+            sc = sc.filter(realization=sorted(realizations))
+        return sc
+
+    @staticmethod
+    def _match_grids(props, grids) -> Dict[str, objects.CPGrid]:
+        def key(obj):
+            return obj.caseuuid, obj.ensemble, obj.realization
+
+        by_path = {(key(grid), grid.relative_path): grid for grid in grids}
+        by_name = {(key(grid), grid.name): grid for grid in grids}
+        result = {}
+        for prop in props:
+            path = prop.get_property("data.geometry.relative_path")
+            grid = by_path.get((key(prop), path)) or by_name.get(
+                (key(prop), prop.tagname)
+            )
+            if grid is not None:
+                result[prop.uuid] = grid
+        return result
+
+    def _grids_for(self, props) -> Dict[str, objects.CPGrid]:
+        sc = self._grid_context(props)
+        if sc is None:
+            return {}
+        grids = sc._objects_of_class(
+            sc._search_all(select=sc._select), objects.CPGrid
+        )
+        return self._match_grids(props, grids)
+
+    async def _grids_for_async(self, props) -> Dict[str, objects.CPGrid]:
+        sc = self._grid_context(props)
+        if sc is None:
+            return {}
+        grids = sc._objects_of_class(
+            await sc._search_all_async(select=sc._select), objects.CPGrid
+        )
+        return self._match_grids(props, grids)
+
+    def resolve_grids(self) -> Dict[str, objects.CPGrid]:
+        """Find the grid of every grid property in the current context.
+
+        All grids are found with a single search, instead of one count
+        and one search per property as with `CPGridProperty.grid`.
+        Properties without a matching grid are left out.
+
+        Returns:
+            Dict[str, CPGrid]: mapping from property uuid to grid
+
+        Examples:
+            Group the properties of an ensemble by grid::
+
+                props = ensemble.grid_properties.filter(name="PORO")
+                grids = props.resolve_grids()
+        """
+        props = self._objects_of_class(
+            self._search_all(select=self._select), objects.CPGridProperty
+        )
+        return self._grids_for(props)
+
+    async def resolve_grids_async(self) -> Dict[str, objects.CPGrid]:
+        """Find the grid of every grid property in the current context;
+        see `resolve_grids`.
+
+        Returns:
+            Dict[str, CPGrid]: mapping from property uuid to grid
+        """
+        props = self._objects_of_class(
+            await self._search_all_async(select=self._select),
+            objects.CPGridProperty,
+        )
+        return await self._grids_for_async(props)
+
+    def _property_layout(self, props, active):
+        """Rows and active-cell layout for a realization x cell array of
+        grid properties. active maps grid uuid to the boolean active cell
+        mask of the grid."""
+        import numpy as np
+
+        realizations = [prop.realization for prop in props]
+        if None in realizations or len(set(realizations)) != len(props):
+            raise ValueError("Expected exactly one property per realization.")
+        if len({mask.shape for mask in active.values()}) > 1:
+            raise ValueError(
+                "The properties are on grids of different shapes."
+            )
+        # Cells active in any realization; a cell inactive in some
+        # realization's grid is NaN in that row.
+        union = np.logical_or.reduce(list(active.values()))
+        rows = {real: row for row, real in enumerate(sorted(realizations))}
+        coords = {
+            "REAL": np.asarray(sorted(realizations)),
+            "cell": np.flatnonzero(union),
+        }
+        return rows, {u: m[union] for u, m in active.items()}, union, coords
+
+    @staticmethod
+    def _write_property_row(array, row, values, active, union):
+        import numpy as np
+
+        data = np.ma.filled(
+            np.ma.asarray(values)[union].astype(np.float64), np.nan
+        )
+        data[~active] = np.nan
+        array[row] = data
+
+    def to_memmap(self, path, dtype="float32"):
+        """Stream the grid properties in the current context, one per
+        realization, into a realization x active cell array in a local
+        .npy file, memory-mapped.
+
+        The grids are found with `resolve_grids` and decoded through the
+        grid geometry cache. Properties are downloaded and decoded
+        concurrently and written to their row as they arrive, so only a
+        few decoded properties are held in memory at any time. The
+        columns are the cells active in any realization's grid; cells
+        that are inactive, or undefined, in a realization are NaN.
+
+        Args:
+            path (str | Path): the .npy file to create
+            dtype: data type of the array
+
+        Returns:
+            Tuple[np.memmap, Dict[str, np.ndarray]]: the array, and its
+            coordinates: "REAL" and "cell", the flat (column, row,
+            layer) C order index of each cell in the grid.
+
+        Examples:
+            Per-cell ensemble mean of porosity, out of core::
+
+                props = ensemble.grid_properties.filter(name="PORO")
+                poro, coords = props.to_memmap("poro.npy")
+                mean = np.nanmean(poro, axis=0)
+        """
+        import numpy as np
+
+        props = self._objects_of_class(
+            self._search_all(select=self._select), objects.CPGridProperty
+        )
+        links = self._grids_for(props)
+        missing = [prop.uuid for prop in props if prop.uuid not in links]
+        if len(missing) > 0:
+            raise ValueError(f"No grid found for properties {missing}")
+        unique = {grid.uuid: grid for grid in links.values()}
+
+        # Keep only the active cell mask of each grid; the decoded
+        # geometry and the blob are dropped, and not cached.
+        def mask(grid):
+            geometry = grid.to_cpgrid()
+            grid.release()
+            return grid.uuid, geometry.actnum_array.astype(bool)
+
+        masks = dict(self._iter_completed(unique.values(), mask))
+        rows, active, union, coords = self._property_layout(props, masks)
+        array = np.lib.format.open_memmap(
+            path,
+            mode="w+",
+            dtype=dtype,
+            shape=(len(props), len(coords["cell"])),
+        )
+
+        def fetch(prop):
+            values = prop.to_cpgrid_property().values
+            prop.release()
+            grid = links[prop.uuid].uuid
+            self._write_property_row(
+                array, rows[prop.realization], values, active[grid], union
+            )
+
+        for _ in self._iter_completed(props, fetch):
+            pass
+        array.flush()
+        return array, coords
+
+    async def to_memmap_async(self, path, dtype="float32"):
+        """Stream the grid properties in the current context into a
+        memory-mapped realization x active cell array; see
+        `to_memmap`.
+
+        Returns:
+            Tuple[np.memmap, Dict[str, np.ndarray]]: the array, and its
+            coordinates.
+        """
+        import numpy as np
+
+        props = self._objects_of_class(
+            await self._search_all_async(select=self._select),
+            objects.CPGridProperty,
+        )
+        links = await self._grids_for_async(props)
+        missing = [prop.uuid for prop in props if prop.uuid not in links]
+        if len(missing) > 0:
+            raise ValueError(f"No grid found for properties {missing}")
+        unique = {grid.uuid: grid for grid in links.values()}
+
+        async def mask(grid):
+            geometry = await grid.to_cpgrid_async()
+            grid.release()
+            return grid.uuid, geometry.actnum_array.astype(bool)
+
+        masks = {
+            uuid: active
+            async for uuid, active in self._iter_completed_async(
+                unique.values(), mask
+            )
+        }
+        rows, active, union, coords = self._property_layout(props, masks)
+        array = np.lib.format.open_memmap(
+            path,
+            mode="w+",
+            dtype=dtype,
+            shape=(len(props), len(coords["cell"])),
+        )
+
+        async def fetch(prop):
+            values = (await prop.to_cpgrid_property_async()).values
+            prop.release()
+            grid = links[prop.uuid].uuid
+            self._write_property_row(
+                array, rows[prop.realization], values, active[grid], union
+            )
+
+        async for _ in self._iter_completed_async(props, fetch):
+            pass
+        array.flush()
+        return array, coords
+
+    @staticmethod
+    def _stack_traces(cubes, results):
+        import numpy as np
+
+        samples = {cube.reader.shape[2] for cube in cubes}
+        if len(samples) > 1:
+            raise ValueError(
+                f"Cubes have different numbers of samples: {sorted(samples)}"
+            )
+        traces = np.stack([results[i] for i in range(len(cubes))])
+        coords = {
+            "cube": np.asarray([cube.uuid for cube in cubes]),
+            "location": np.arange(traces.shape[1]),
+            "sample": cubes[0].reader.axes[2],
+        }
+        return traces, coords
+
+    def extract_traces(self, locations):
+        """Extract traces at a set of locations from every cube in the
+        current context, e.g. the realizations of an ensemble or the
+        surveys matched by `Filters.seismic4d`.
+
+        Cubes are opened and read concurrently; blob credentials are
+        shared through the SAS cache, see `Child.auth`.
+
+        Args:
+            locations: sequence of (inline, crossline) number pairs
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: a cube x location
+            x sample array, and its coordinates ("cube" with the cube
+            uuids, "location" and "sample", in axis order).
+
+        Examples:
+            Traces along a well path in all realizations::
+
+                cubes = ensemble.cubes.filter(
+                    name="seismic", tagname="amplitude"
+                )
+                traces, coords = cubes.extract_traces(
+                    [(1010, 2030), (1011, 2030)]
+                )
+        """
+        cubes = self._objects_of_class(
+            self._search_all(select=self._select), objects.Cube
+        )
+
+        def fetch(item):
+            i, cube = item
+            return i, cube.read_traces(locations)
+
+        results = dict(self._iter_completed(enumerate(cubes), fetch))
+        return self._stack_traces(cubes, results)
+
+    async def extract_traces_async(self, locations):
+        """Extract traces at a set of locations from every cube in the
+        current context; see `extract_traces`.
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: a cube x location
+            x sample array, and its coordinates.
+        """
+        cubes = self._objects_of_class(
+            await self._search_all_async(select=self._select), objects.Cube
+        )
+
+        async def fetch(item):
+            i, cube = item
+            # Fill the credential cache without blocking the event loop;
+            # OpenVDS itself is blocking and runs in a worker thread.
+            await cube.auth_async
+            return i, await asyncio.to_thread(cube.read_traces, locations)
+
+        results = {
+            i: traces
+            async for i, traces in self._iter_completed_async(
+                enumerate(cubes), fetch
+            )
+        }
+        return self._stack_traces(cubes, results)
+
     def aggregation(
         self, column=None, operation=None, no_wait=False
     ) -> objects.Child | httpx.Response:
@@ -2221,6 +3618,7 @@ def _gen_filter_doc(spec):
         _gen_filter_name: "Name",
         _gen_filter_gen: "General",
         _gen_filter_time: "Time",
+        _gen_filter_bbox: "Area",
         _gen_filter_complex: "Complex",
     }
     ret = """\
@@ -2295,6 +3693,12 @@ Examples:
                     aggregation=False
                 )
 
+    Get surfaces overlapping an area (xmin, ymin, xmax, ymax)::
+
+        surfs = case.surfaces.filter(
+                    bbox=(456000, 5930000, 460000, 5934000)
+                )
+
 """
     )
     return ret
@@ -1,12 +1,69 @@
 """Module containing class for cpgrid"""
 
+from collections import Counter
+from pathlib import PurePosixPath
 from typing import Dict
 
 from sumo.wrapper import SumoClient
 
+from fmu.sumo.explorer.cache import LRUCache
+
 from ._child import Child
 from ._search_context import SearchContext
 
+# Decoded grids, keyed by file name and md5 checksum, so that identical
+# grids in different realizations are decoded once. Each entry holds a
+# full decoded grid, often hundreds of MiB for large models, so only a
+# few are kept; see CPGrid.set_geometry_cache_size.
+_grid_geometries = LRUCache(4)
+
+
+def _active_cells(grid):
+    """Boolean (ncol, nrow, nlay) mask of the active cells of an xtgeo
+    Grid."""
+    return grid.actnum_array.astype(bool)
+
+
+def _active_values(gridproperty, active):
+    """Values of an xtgeo GridProperty in the active cells, as a 1D
+    array in (column, row, layer) C order."""
+    import numpy as np
+
+    return np.ma.getdata(gridproperty.values)[active]
+
+
+def _property_date(obj):
+    """Date label of a grid property, YYYYMMDD or YYYYMMDD_YYYYMMDD for
+    an interval, as in xtgeo restart property names; None if the
+    property has no time."""
+    times = obj.interval or (obj.timestamp,)
+    if times[0] is None:
+        return None
+    return "_".join(t[:10].replace("-", "") for t in times)
+
+
+def _property_keys(objs):
+    """Keys for grid properties: the property name, or, for names shared
+    by several properties such as restart properties at different dates,
+    NAME_YYYYMMDD."""
+    counts = Counter(obj.name for obj in objs)
+    keys = []
+    for obj in objs:
+        key = obj.name
+        if counts[obj.name] > 1:
+            date = _property_date(obj)
+            if date is None:
+                raise ValueError(
+                    f"Several grid properties named {obj.name} without "
+                    "time; select them by name or tagname."
+                )
+            key = f"{obj.name}_{date}"
+        keys.append(key)
+    duplicates = [key for key, n in Counter(keys).items() if n > 1]
+    if len(duplicates) > 0:
+        raise ValueError(f"Several grid properties for {duplicates}.")
+    return keys
+
 
 class CPGrid(Child):
     """Class representing a cpgrid object in Sumo."""
@@ -53,6 +110,55 @@ class CPGrid(Child):
         except TypeError as type_err:
             raise TypeError(f"Unknown format: {self.format}") from type_err
 
+    @staticmethod
+    def set_geometry_cache_size(capacity: int):
+        """Set the number of decoded grids kept for reuse by
+        `load_with_properties`.
+
+        Each cached grid holds its full geometry in memory (coordinates,
+        corner depths and active cells), so the memory cost is roughly
+        capacity times the size of the largest grid. The least recently
+        used grids are evicted if the cache shrinks, and a capacity of 0
+        disables the cache.
+
+        Args:
+            capacity: maximum number of grids to keep (default 4)
+        """
+        _grid_geometries.resize(capacity)
+
+    @staticmethod
+    def clear_geometry_cache():
+        """Drop all decoded grids from the geometry cache."""
+        _grid_geometries.clear()
+
+    def _geometry_key(self):
+        checksum = self.get_property("file.checksum_md5")
+        if checksum is None or self.relative_path is None:
+            return None
+        return PurePosixPath(self.relative_path).name, checksum
+
+    def _geometry(self):
+        """Decoded grid, shared through the geometry cache."""
+        key = self._geometry_key()
+        grid = None if key is None else _grid_geometries.get(key)
+        if grid is None:
+            grid = self.to_cpgrid()
+            self.release()
+            if key is not None:
+                _grid_geometries.put(key, grid)
+        return grid
+
+    async def _geometry_async(self):
+        """Decoded grid, shared through the geometry cache."""
+        key = self._geometry_key()
+        grid = None if key is None else _grid_geometries.get(key)
+        if grid is None:
+            grid = await self.to_cpgrid_async()
+            self.release()
+            if key is not None:
+                _grid_geometries.put(key, grid)
+        return grid
+
     @property
     def grid_properties(self):
         """Get cpgrid_property instances that use this cpgrid instance.
@@ -79,3 +185,107 @@ class CPGrid(Child):
                 }
             },
         )
+
+    def _property_objects(self, hits):
+        from .cpgrid_property import CPGridProperty
+
+        return SearchContext(self._sumo)._objects_of_class(
+            hits, CPGridProperty
+        )
+
+    @staticmethod
+    def _bundle(grid, gridproperties):
+        active = _active_cells(grid)
+        keys = _property_keys([obj for obj, _ in gridproperties])
+        return grid, {
+            key: _active_values(gridproperty, active)
+            for key, (_, gridproperty) in zip(keys, gridproperties)
+        }
+
+    def load_with_properties(self, names=None):
+        """Load the grid together with its grid properties.
+
+        The grid and the properties are downloaded and decoded
+        concurrently, in one pass. The grid geometry is decoded once, and
+        the property values are returned for the active cells only.
+        Decoded grids are cached by file name and checksum, so the
+        returned grid may be shared; copy it before modifying it. The
+        cache keeps up to 4 grids alive, each with its full geometry in
+        memory, until they are evicted; use
+        `CPGrid.set_geometry_cache_size` to change this (0 disables the
+        cache) and `CPGrid.clear_geometry_cache` to free it.
+
+        Args:
+            names (str | List[str]): property names; all properties
+              linked to this grid by default.
+
+        Returns:
+            Tuple[Grid, Dict[str, np.ndarray]]: the grid, and a mapping
+            from property name to values in the active cells, in
+            (column, row, layer) C order. Properties that share a name,
+            such as restart properties at several dates, are keyed
+            NAME_YYYYMMDD.
+
+        Examples:
+            Porosity and permeability in the active cells::
+
+                grid, props = cpgrid.load_with_properties(
+                    names=["PORO", "PERMX"]
+                )
+                mean_poro = props["PORO"].mean()
+        """
+        props = self.grid_properties
+        if names is not None:
+            props = props.filter(name=names)
+        objs = [
+            self,
+            *self._property_objects(props._search_all(select=props._select)),
+        ]
+
+        def fetch(obj):
+            if obj is self:
+                return obj, obj._geometry()
+            result = obj.to_cpgrid_property()
+            obj.release()
+            return obj, result
+
+        decoded = {
+            obj.uuid: (obj, result)
+            for obj, result in SearchContext._iter_completed(objs, fetch)
+        }
+        grid = decoded.pop(self.uuid)[1]
+        return self._bundle(grid, list(decoded.values()))
+
+    async def load_with_properties_async(self, names=None):
+        """Load the grid together with its grid properties; see
+        `load_with_properties`.
+
+        Returns:
+            Tuple[Grid, Dict[str, np.ndarray]]: the grid, and a mapping
+            from property name to values in the active cells.
+        """
+        props = self.grid_properties
+        if names is not None:
+            props = props.filter(name=names)
+        objs = [
+            self,
+            *self._property_objects(
+                await props._search_all_async(select=props._select)
+            ),
+        ]
+
+        async def fetch(obj):
+            if obj is self:
+                return obj, await obj._geometry_async()
+            result = await obj.to_cpgrid_property_async()
+            obj.release()
+            return obj, result
+
+        decoded = {
+            obj.uuid: (obj, result)
+            async for obj, result in SearchContext._iter_completed_async(
+                objs, fetch
+            )
+        }
+        grid = decoded.pop(self.uuid)[1]
+        return self._bundle(grid, list(decoded.values()))
@@ -59,29 +59,6 @@ class CPGridProperty(Child):
         Returns:
             Grid: a Grid object (an instance of class CPGrid).
         """
-        sc = SearchContext(self._sumo).grids.filter(
-            uuid=self.caseuuid,
-            ensemble=self.ensemble,
-            realization=self.realization,
-        )
-        should = [
-            {"term": {"data.name.keyword": self.tagname}},
-        ]
-        dgrp = (
-            self.metadata.get("data", {})
-            .get("geometry", {})
-            .get("relative_path", None)
-        )
-        if dgrp is not None:
-            should.append({"term": {"file.relative_path.keyword": dgrp}})
-            pass
-        sc = sc.filter(
-            complex={
-                "bool": {
-                    "minimum_should_match": 1,
-                    "should": should,
-                }
-            }
-        )
-        assert len(sc) == 1
-        return sc[0]
+        grids = SearchContext(self._sumo)._grids_for([self])
+        assert self.uuid in grids
+        return grids[self.uuid]
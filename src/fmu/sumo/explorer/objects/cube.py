@@ -1,11 +1,98 @@
 """Module containing class for cube object"""
 
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 from sumo.wrapper import SumoClient
 
+from fmu.sumo.explorer.cache import LRUCache
+
 from ._child import Child
 
+# Decoded bricks, keyed by (cube uuid, brick index); shared by all cubes.
+# With the default 64**3 float32 bricks, each entry is 1 MiB, so the
+# default capacity holds at most about 256 MiB. See
+# Cube.set_brick_cache_size.
+_brick_cache = LRUCache(256)
+
+_DEFAULT_BRICK_SHAPE = (64, 64, 64)
+
+
+class OpenVdsReader:
+    """Cube reader backend using OpenVDS.
+
+    A reader backend exposes the cube geometry in index space, with axes
+    ordered (inline, crossline, sample), and reads rectangular regions
+    as numpy arrays. Any object with the same attributes can be assigned
+    to `Cube.reader`.
+
+    Attributes:
+        shape: number of inlines, crosslines and samples
+        brick_shape: shape of the bricks that are read and cached
+        axes: coordinate values (inline numbers, crossline numbers and
+          sample times or depths) along each axis
+    """
+
+    def __init__(self, handle, brick_shape=_DEFAULT_BRICK_SHAPE):
+        """
+        Args:
+            handle: an OpenVDS handle, see `Cube.openvds_handle`
+            brick_shape: shape of the bricks read through the cache
+        """
+        import numpy as np
+
+        try:
+            import openvds
+        except ModuleNotFoundError:
+            raise RuntimeError(
+                "Unable to import openvds; probably not installed."
+            )
+        self._openvds = openvds
+        self._handle = handle
+        self._access = openvds.getAccessManager(handle)
+        layout = openvds.getLayout(handle)
+        # VDS dimension 0 is the sample axis and dimension 2 the inline
+        # axis; the reader axes are in the opposite order.
+        descriptors = [layout.getAxisDescriptor(dim) for dim in (2, 1, 0)]
+        self.shape = tuple(d.numSamples for d in descriptors)
+        self.axes = [
+            np.linspace(d.coordinateMin, d.coordinateMax, d.numSamples)
+            for d in descriptors
+        ]
+        self.brick_shape = tuple(brick_shape)
+
+    def read(self, start, stop):
+        """Read the region [start, stop) as a float32 array with shape
+        stop - start, axes ordered (inline, crossline, sample)."""
+        openvds = self._openvds
+        request = self._access.requestVolumeSubset(
+            (start[2], start[1], start[0], 0, 0, 0),
+            (stop[2], stop[1], stop[0], 1, 1, 1),
+            format=openvds.VolumeDataChannelDescriptor.Format.Format_R32,
+        )
+        return request.data.reshape(tuple(b - a for a, b in zip(start, stop)))
+
+
+def _axis_index(values, value, name) -> int:
+    """Index of value among the coordinate values of an axis."""
+    import numpy as np
+
+    index = int(np.argmin(np.abs(values - value)))
+    if not np.isclose(values[index], value):
+        raise ValueError(
+            f"{name} {value} is not in the cube; "
+            f"the range is {values[0]} to {values[-1]}"
+        )
+    return index
+
+
+def _axis_range(values, bounds, name) -> Tuple[int, int]:
+    """Index range [start, stop) for inclusive coordinate bounds, or the
+    whole axis if bounds is None."""
+    if bounds is None:
+        return 0, len(values)
+    first, last = sorted(_axis_index(values, bound, name) for bound in bounds)
+    return first, last + 1
+
 
 class Cube(Child):
     """Class representig a seismic cube object in Sumo"""
@@ -17,28 +104,7 @@ class Cube(Child):
             metadata (dict): cube metadata
         """
         super().__init__(sumo, metadata, blob)
-
-    def _extract_auth(self, res) -> Tuple[str, str]:
-        try:
-            res = res.json()
-            url = res.get("baseuri") + self.uuid
-            sas = res.get("auth")
-        except Exception:
-            url, sas = res.text.split("?")
-            pass
-        return url, sas
-
-    @property
-    def auth(self) -> Tuple[str, str]:
-        res = self._sumo.get(f"/objects('{self.uuid}')/blob/authuri")
-        return self._extract_auth(res)
-
-    @property
-    async def auth_async(self) -> Tuple[str, str]:
-        res = await self._sumo.get_async(
-            f"/objects('{self.uuid}')/blob/authuri"
-        )
-        return self._extract_auth(res)
+        self._reader = None
 
     @property
     def openvds_handle(self):
@@ -67,3 +133,168 @@ class Cube(Child):
         url = url.replace("https://", "azureSAS://") + "/"
         sas = "Suffix=?" + sas
         return openvds.open(url, sas)
+
+    @property
+    def reader(self):
+        """Backend used by the read_* methods; an `OpenVdsReader` on the
+        cube's OpenVDS handle unless another backend has been assigned.
+        """
+        if self._reader is None:
+            self._reader = OpenVdsReader(self.openvds_handle)
+        return self._reader
+
+    @reader.setter
+    def reader(self, reader):
+        self._reader = reader
+
+    @staticmethod
+    def set_brick_cache_size(capacity: int):
+        """Set the number of decoded bricks kept in the brick cache
+        shared by all cubes.
+
+        Each brick takes brick_shape[0] * brick_shape[1] *
+        brick_shape[2] * 4 bytes; 1 MiB for the default 64x64x64 bricks.
+        The least recently used bricks are evicted if the cache shrinks,
+        and a capacity of 0 disables the cache.
+
+        Args:
+            capacity: maximum number of bricks to keep (default 256)
+        """
+        _brick_cache.resize(capacity)
+
+    @staticmethod
+    def clear_brick_cache():
+        """Drop all decoded bricks from the brick cache."""
+        _brick_cache.clear()
+
+    def _brick(self, index):
+        key = (self.uuid, *index)
+        brick = _brick_cache.get(key)
+        if brick is None:
+            reader = self.reader
+            start = [i * b for i, b in zip(index, reader.brick_shape)]
+            stop = [
+                min(s + b, n)
+                for s, b, n in zip(start, reader.brick_shape, reader.shape)
+            ]
+            brick = reader.read(start, stop)
+            _brick_cache.put(key, brick)
+        return brick
+
+    def _read(self, start, stop):
+        """Read the index region [start, stop) through the brick cache."""
+        import itertools
+
+        import numpy as np
+
+        brick_shape = self.reader.brick_shape
+        result = np.empty([b - a for a, b in zip(start, stop)], np.float32)
+        ranges = [
+            range(first // size, (last - 1) // size + 1)
+            for first, last, size in zip(start, stop, brick_shape)
+        ]
+        for index in itertools.product(*ranges):
+            brick = self._brick(index)
+            target, source = [], []
+            for i, size, first, last, extent in zip(
+                index, brick_shape, start, stop, brick.shape
+            ):
+                origin = i * size
+                low, high = max(first, origin), min(last, origin + extent)
+                target.append(slice(low - first, high - first))
+                source.append(slice(low - origin, high - origin))
+            result[tuple(target)] = brick[tuple(source)]
+        return result
+
+    def read_subvolume(
+        self,
+        inlines: Optional[Tuple[float, float]] = None,
+        crosslines: Optional[Tuple[float, float]] = None,
+        samples: Optional[Tuple[float, float]] = None,
+    ):
+        """Read a sub-volume of the cube.
+
+        Data is read in bricks through an LRU cache shared by all cubes,
+        so reading adjacent or overlapping regions reuses bricks that
+        have already been decoded. The cache holds up to 256 bricks by
+        default; with 64x64x64 float32 bricks that is about 256 MiB,
+        which stays in memory until evicted. Use
+        `Cube.set_brick_cache_size` to change the capacity (0 disables
+        the cache) and `Cube.clear_brick_cache` to free it.
+
+        Args:
+            inlines: first and last inline number (inclusive); all
+              inlines by default
+            crosslines: first and last crossline number (inclusive)
+            samples: first and last sample time or depth (inclusive)
+
+        Returns:
+            np.ndarray: values with axes (inline, crossline, sample)
+        """
+        axes = self.reader.axes
+        bounds = [
+            _axis_range(values, limits, name)
+            for values, limits, name in zip(
+                axes,
+                [inlines, crosslines, samples],
+                ["Inline", "Crossline", "Sample"],
+            )
+        ]
+        return self._read(*zip(*bounds))
+
+    def read_inline(self, inline: float):
+        """Read one inline.
+
+        Args:
+            inline: inline number
+
+        Returns:
+            np.ndarray: values with axes (crossline, sample)
+        """
+        return self.read_subvolume(inlines=(inline, inline))[0]
+
+    def read_crossline(self, crossline: float):
+        """Read one crossline.
+
+        Args:
+            crossline: crossline number
+
+        Returns:
+            np.ndarray: values with axes (inline, sample)
+        """
+        return self.read_subvolume(crosslines=(crossline, crossline))[:, 0]
+
+    def read_timeslice(self, sample: float):
+        """Read one time or depth slice.
+
+        Args:
+            sample: sample time or depth
+
+        Returns:
+            np.ndarray: values with axes (inline, crossline)
+        """
+        return self.read_subvolume(samples=(sample, sample))[:, :, 0]
+
+    def read_traces(self, locations):
+        """Read whole traces at a set of locations.
+
+        Traces are read directly from the backend, bypassing the brick
+        cache, so that each trace costs one trace worth of data.
+
+        Args:
+            locations: sequence of (inline, crossline) number pairs
+
+        Returns:
+            np.ndarray: values with axes (location, sample)
+        """
+        import numpy as np
+
+        reader = self.reader
+        inlines, crosslines, _ = reader.axes
+        nsample = reader.shape[2]
+        result = np.empty((len(locations), nsample), np.float32)
+        for row, (inline, crossline) in enumerate(locations):
+            i = _axis_index(inlines, inline, "Inline")
+            x = _axis_index(crosslines, crossline, "Crossline")
+            result[row] = reader.read((i, x, 0), (i + 1, x + 1, nsample))[0, 0]
+        return result
@@ -1,11 +1,196 @@
 """Module for (pseudo) ensemble class."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
 from sumo.wrapper import SumoClient
 
 from ._document import Document
 from ._search_context import SearchContext
+from .table import _arrow_to_pandas
+
+_PARAMETERS_SELECT = ["fmu.realization.id", "fmu.realization.parameters"]
+
+
+def _flatten_parameters(parameters: dict, prefix: str = "") -> dict:
+    """Flatten nested parameter groups to "GROUP:NAME" keys."""
+    flat = {}
+    for key, value in parameters.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten_parameters(value, f"{name}:"))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _parameter_table(hits):
+    """Realization x parameter arrow table from search hits projected on
+    the realization id and parameters, sorted by realization."""
+    import pyarrow as pa
+
+    rows = {}
+    for hit in hits:
+        realization = hit["_source"]["fmu"]["realization"]
+        rows[realization["id"]] = _flatten_parameters(
+            realization.get("parameters", {})
+        )
+    reals = sorted(rows)
+    names = sorted({name for row in rows.values() for name in row})
+    columns = {"REAL": pa.array(reals, type=pa.int32())}
+    for name in names:
+        values = [rows[real].get(name) for real in reals]
+        try:
+            columns[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed numbers and strings; keep the values as strings.
+            columns[name] = pa.array(
+                [None if v is None else str(v) for v in values]
+            )
+    return pa.table(columns)
+
+
+def _sorted_by_realization(arrowtable):
+    import pyarrow.compute as pc
+
+    return arrowtable.take(pc.sort_indices(arrowtable["REAL"]))
+
+
+def _numeric_columns(arrowtable, exclude=("REAL",)):
+    import pyarrow as pa
+
+    return [
+        field.name
+        for field in arrowtable.schema
+        if field.name not in exclude
+        and (
+            pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+        )
+    ]
+
+
+def _reduce_responses(arrowtable, reduce):
+    """One row per realization: reduce each numeric response column over
+    the rows of a realization, e.g. "last" for summary endpoints or "sum"
+    for in-place volumes."""
+    columns = _numeric_columns(arrowtable)
+    reduced = arrowtable.group_by("REAL", use_threads=False).aggregate(
+        [(column, reduce) for column in columns]
+    )
+    return reduced.rename_columns(
+        {f"{column}_{reduce}": column for column in columns}
+    )
+
+
+def _response_table(responses):
+    """Responses given as an arrow table or a pandas DataFrame, with a
+    REAL column or indexed by realization."""
+    import pyarrow as pa
+
+    if isinstance(responses, pa.Table):
+        return responses
+    if "REAL" not in responses.columns:
+        responses = responses.rename_axis("REAL").reset_index()
+    return pa.Table.from_pandas(responses, preserve_index=False)
+
+
+def _average_ranks(values):
+    """Ranks, from 1, of each column of a 2D array; tied values get the
+    average of their ranks."""
+    import numpy as np
+
+    count = values.shape[0]
+    order = np.argsort(values, axis=0, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=0)
+    position = np.broadcast_to(np.arange(count)[:, None], values.shape)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+    first = np.maximum.accumulate(np.where(starts, position, 0), axis=0)
+    last = np.minimum.accumulate(
+        np.where(ends, position, count - 1)[::-1], axis=0
+    )[::-1]
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=0)
+    return ranks
+
+
+def _correlations(x, y):
+    """Pearson correlation between every column of x and every column of
+    y, as a matrix product of standardized columns. Constant columns
+    give NaN."""
+    import numpy as np
+
+    def standardized(a):
+        a = a - a.mean(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return a / np.sqrt((a * a).sum(axis=0))
+
+    return standardized(x).T @ standardized(y)
+
+
+def _tornado(x, y, fraction):
+    """Mean response over the realizations with each parameter at or
+    below its fraction quantile (low) and at or above its 1 - fraction
+    quantile (high)."""
+    import numpy as np
+
+    low, high = np.quantile(x, [fraction, 1 - fraction], axis=0)
+
+    def mean_where(mask):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (mask.T @ y) / mask.sum(axis=0)[:, None]
+
+    return mean_where((x <= low).astype(float)), mean_where(
+        (x >= high).astype(float)
+    )
+
+
+def _sensitivity_table(parameters, responses, fraction):
+    """Correlation and tornado statistics for every parameter-response
+    pair; realizations are matched by the REAL column."""
+    import numpy as np
+    import pyarrow as pa
+
+    preals = parameters["REAL"].to_numpy()
+    rreals = responses["REAL"].to_numpy()
+    _, pidx, ridx = np.intersect1d(preals, rreals, return_indices=True)
+    pnames = _numeric_columns(parameters)
+    rnames = _numeric_columns(responses)
+    x = np.column_stack(
+        [parameters[n].to_numpy(zero_copy_only=False) for n in pnames]
+    ).astype(float)[pidx]
+    y = np.column_stack(
+        [responses[n].to_numpy(zero_copy_only=False) for n in rnames]
+    ).astype(float)[ridx]
+    # Realizations with undefined responses are left out; parameters
+    # undefined in some realization get NaN statistics.
+    complete = np.isfinite(y).all(axis=1)
+    x, y = x[complete], y[complete]
+    if len(y) < 2:
+        raise ValueError("Too few realizations with parameters and responses.")
+    reference = y.mean(axis=0)
+    pearson = _correlations(x, y)
+    spearman = _correlations(_average_ranks(x), _average_ranks(y))
+    low, high = _tornado(x, y, fraction)
+    low, high = low - reference, high - reference
+    undefined = ~np.isfinite(x).all(axis=0)
+    for stat in (pearson, spearman, low, high):
+        stat[undefined] = np.nan
+    return pa.table(
+        {
+            "parameter": np.repeat(pnames, len(rnames)),
+            "response": np.tile(rnames, len(pnames)),
+            "pearson": pearson.ravel(),
+            "spearman": spearman.ravel(),
+            "low": low.ravel(),
+            "high": high.ravel(),
+            "swing": np.abs(high - low).ravel(),
+            "realizations": np.full(len(pnames) * len(rnames), len(y)),
+        }
+    )
 
 
 class Ensemble(Document, SearchContext):
@@ -78,6 +263,177 @@ class Ensemble(Document, SearchContext):
         """FMU ensemble uuid"""
         return self.get_property("fmu.ensemble.uuid")
 
+    def _parameter_sources(self):
+        return (
+            self.parameters.filter(cls="table", realization=False),
+            self.parameters.filter(cls="dictionary"),
+        )
+
+    def parameter_table(self):
+        """Realization x parameter matrix for the ensemble, as an arrow
+        table with a REAL column, sorted by realization.
+
+        The ensemble-level parameters table is used when present.
+        Otherwise the parameters are read from the metadata of the
+        realization parameters dictionaries, in one search projected on
+        fmu.realization.parameters, without downloading any blobs.
+        Nested parameter groups are flattened to "GROUP:NAME" columns.
+
+        Returns:
+            pa.Table: one row per realization
+
+        Examples:
+            Parameter matrix for an ensemble::
+
+                params = ensemble.parameter_table()
+        """
+        tables, dictionaries = self._parameter_sources()
+        if len(tables) > 0:
+            arrowtable = tables.single.to_arrow()
+            if "REAL" in arrowtable.column_names:
+                return _sorted_by_realization(arrowtable)
+        return _parameter_table(
+            dictionaries._search_all(select=_PARAMETERS_SELECT)
+        )
+
+    async def parameter_table_async(self):
+        """Realization x parameter matrix for the ensemble, as an arrow
+        table; see `parameter_table`.
+
+        Returns:
+            pa.Table: one row per realization
+        """
+        tables, dictionaries = self._parameter_sources()
+        if await tables.length_async() > 0:
+            arrowtable = await (await tables.single_async).to_arrow_async()
+            if "REAL" in arrowtable.column_names:
+                return _sorted_by_realization(arrowtable)
+        return _parameter_table(
+            await dictionaries._search_all_async(select=_PARAMETERS_SELECT)
+        )
+
+    def parameter_matrix(self, dtype_backend=None):
+        """Realization x parameter matrix for the ensemble, as a pandas
+        DataFrame indexed by realization id; see `parameter_table`.
+
+        Args:
+            dtype_backend (str): None for numpy dtypes, or "pyarrow".
+
+        Returns:
+            DataFrame: one row per realization
+        """
+        return _arrow_to_pandas(
+            self.parameter_table(), dtype_backend
+        ).set_index("REAL")
+
+    async def parameter_matrix_async(self, dtype_backend=None):
+        """Realization x parameter matrix for the ensemble, as a pandas
+        DataFrame indexed by realization id; see `parameter_table`.
+
+        Args:
+            dtype_backend (str): None for numpy dtypes, or "pyarrow".
+
+        Returns:
+            DataFrame: one row per realization
+        """
+        return _arrow_to_pandas(
+            await self.parameter_table_async(), dtype_backend
+        ).set_index("REAL")
+
+    def sensitivities(
+        self,
+        responses,
+        columns=None,
+        reduce="last",
+        fraction=0.1,
+        dtype_backend=None,
+    ):
+        """Screen the sensitivity of responses to the ensemble parameters.
+
+        For every pair of numeric parameter and response, gives the
+        Pearson and Spearman (rank) correlation over the realizations,
+        and tornado statistics: the mean response over the realizations
+        with the parameter in its lowest (low) and highest (high)
+        fraction, relative to the ensemble mean, and swing = |high -
+        low|. The statistics are computed for all pairs at once, as
+        matrix products.
+
+        The parameter matrix (see `parameter_table`) and the responses
+        are fetched concurrently.
+
+        Args:
+            responses (SearchContext | pa.Table | DataFrame): tables of
+              realization responses, with a REAL column or, for a
+              DataFrame, indexed by realization. Tables in a
+              SearchContext are downloaded, stacked and reduced to one
+              row per realization.
+            columns (str | List[str]): response columns to download from
+              a SearchContext; see `SearchContext.to_arrow`.
+            reduce (str): how to reduce the rows of a realization in
+              downloaded tables: "last" (e.g. summary endpoints), "sum"
+              (e.g. volumes), "mean", "min" or "max".
+            fraction (float): quantile defining the low and high groups
+              of realizations for the tornado statistics.
+            dtype_backend (str): None for numpy dtypes, or "pyarrow".
+
+        Returns:
+            DataFrame: one row per parameter and response, with columns
+            parameter, response, pearson, spearman, low, high, swing and
+            realizations (the number of realizations used).
+
+        Examples:
+            Rank parameters by their effect on in-place volumes::
+
+                volumes = ensemble.tables.filter(
+                    tagname="vol", realization=True
+                )
+                sens = ensemble.sensitivities(
+                    volumes, columns=["STOIIP_OIL"], reduce="sum"
+                )
+                sens.sort_values("swing", ascending=False)
+        """
+        with ThreadPoolExecutor(2) as executor:
+            parameters = executor.submit(self.parameter_table)
+            if isinstance(responses, SearchContext):
+                responses = _reduce_responses(
+                    responses.to_arrow(columns), reduce
+                )
+            else:
+                responses = _response_table(responses)
+            parameters = parameters.result()
+        return _arrow_to_pandas(
+            _sensitivity_table(parameters, responses, fraction),
+            dtype_backend,
+        )
+
+    async def sensitivities_async(
+        self,
+        responses,
+        columns=None,
+        reduce="last",
+        fraction=0.1,
+        dtype_backend=None,
+    ):
+        """Screen the sensitivity of responses to the ensemble
+        parameters; see `sensitivities`.
+
+        Returns:
+            DataFrame: one row per parameter and response
+        """
+        if isinstance(responses, SearchContext):
+            parameters, responses = await asyncio.gather(
+                self.parameter_table_async(),
+                responses.to_arrow_async(columns),
+            )
+            responses = _reduce_responses(responses, reduce)
+        else:
+            parameters = await self.parameter_table_async()
+            responses = _response_table(responses)
+        return _arrow_to_pandas(
+            _sensitivity_table(parameters, responses, fraction),
+            dtype_backend,
+        )
+
     @property
     def reference_realizations(self):
         """Reference realizations in ensemble. If none, return
@@ -6,6 +6,36 @@ from sumo.wrapper import SumoClient
 
 from ._child import Child
 
+# Column names used for polygon coordinates and ids, in order of
+# preference.
+_X_COLUMNS = ("X_UTME", "X")
+_Y_COLUMNS = ("Y_UTMN", "Y")
+_ID_COLUMNS = ("POLY_ID", "ID")
+
+
+def _polygon_rings(dataframe):
+    """Split a polygons DataFrame into a list of (id, xy) pairs, one per
+    polygon, where xy is an (npoints, 2) array."""
+
+    def pick(names):
+        for name in names:
+            if name in dataframe.columns:
+                return name
+        return None
+
+    x, y, ident = pick(_X_COLUMNS), pick(_Y_COLUMNS), pick(_ID_COLUMNS)
+    if x is None or y is None:
+        raise ValueError(
+            f"Expected polygon coordinates in columns {_X_COLUMNS} and "
+            f"{_Y_COLUMNS}; found {list(dataframe.columns)}"
+        )
+    if ident is None:
+        return [(0, dataframe[[x, y]].to_numpy(dtype="float64"))]
+    return [
+        (key, group[[x, y]].to_numpy(dtype="float64"))
+        for key, group in dataframe.groupby(ident, sort=False)
+    ]
+
 
 class Polygons(Child):
     """Class representig a polygons object in Sumo"""
@@ -1,11 +1,392 @@
 """Module containg class for surface"""
 
+import math
+import re
 from typing import Dict
 
 from sumo.wrapper import SumoClient
 
 from ._child import Child
 
+# Number of histogram bins per node used for approximate quantiles.
+_QUANTILE_BINS = 64
+
+# Number of arrays kept to set the histogram range of each node; up to
+# this many, quantiles are exact.
+_QUANTILE_BUFFER = 16
+
+# Values at or above this are undefined in IRAP binary files.
+_IRAP_UNDEF = 9999900.0
+
+# IRAP binary files are Fortran sequential records, big-endian: a 32,
+# a 16 and a 28 byte header record, each with 4-byte length markers,
+# followed by the values (x varying fastest) in one or more records.
+_IRAP_HEADER_SIZE = 100
+
+_GEOMETRY_KEYS = (
+    "ncol",
+    "nrow",
+    "xori",
+    "yori",
+    "xinc",
+    "yinc",
+    "yflip",
+    "rotation",
+)
+
+
+def _irap_binary_header(buffer) -> Dict:
+    """Geometry from the header records of an IRAP binary file."""
+    import numpy as np
+
+    first = np.frombuffer(buffer, ">i4", count=3, offset=0)
+    if first[0] != 32 or first[1] != -996:
+        raise TypeError("Not an IRAP binary surface.")
+    floats = np.frombuffer(buffer, ">f4", count=6, offset=12)
+    xori, _, yori, _, xinc, yinc = (float(v) for v in floats)
+    ncol = int(np.frombuffer(buffer, ">i4", count=1, offset=44)[0])
+    rotation = float(np.frombuffer(buffer, ">f4", count=1, offset=48)[0])
+    return {
+        "ncol": ncol,
+        "nrow": int(first[2]),
+        "xori": xori,
+        "yori": yori,
+        "xinc": xinc,
+        "yinc": abs(yinc),
+        "yflip": 1 if yinc >= 0 else -1,
+        "rotation": rotation,
+    }
+
+
+def _irap_binary_values(buffer, ncol: int, nrow: int):
+    """Decode the values of an IRAP binary file into an (ncol, nrow)
+    masked float64 array.
+
+    The value records are read through a structured frombuffer view
+    over the blob, so the only copy is the conversion from big-endian
+    float32 into the result array.
+    """
+    import numpy as np
+
+    count = ncol * nrow
+    length = int(np.frombuffer(buffer, ">i4", count=1, offset=100)[0])
+    per = min(length // 4, count)
+    full, rest = divmod(count, per)
+    record = np.dtype(
+        [("head", ">i4"), ("values", ">f4", (per,)), ("tail", ">i4")]
+    )
+    records = np.frombuffer(
+        buffer, record, count=full, offset=_IRAP_HEADER_SIZE
+    )
+    if not (
+        (records["head"] == per * 4).all()
+        and (records["tail"] == per * 4).all()
+    ):
+        raise TypeError("Unsupported IRAP binary record layout.")
+    values = np.empty(count)
+    values[: full * per].reshape(full, per)[...] = records["values"]
+    if rest > 0:
+        values[full * per :] = np.frombuffer(
+            buffer,
+            ">f4",
+            count=rest,
+            offset=_IRAP_HEADER_SIZE + full * record.itemsize + 4,
+        )
+    # x varies fastest in the file; the transpose is a view.
+    values = values.reshape(nrow, ncol).T
+    return np.ma.masked_greater_equal(values, _IRAP_UNDEF, copy=False)
+
+
+def _quantile(operation: str):
+    """The quantile (0-1) for an operation like "p10", or None."""
+    match = re.fullmatch(r"p(\d{1,2})", operation)
+    return None if match is None else int(match.group(1)) / 100
+
+
+def _same_geometry(first: Dict, second: Dict) -> bool:
+    """Whether two grid geometries describe the same nodes, allowing for
+    float32 rounding of the origin, increments and rotation."""
+    return all(
+        math.isclose(first[key], second[key], rel_tol=1e-6, abs_tol=1e-6)
+        for key in _GEOMETRY_KEYS
+    )
+
+
+def _node_coordinates(geometry: Dict):
+    """x and y coordinates of the nodes of a grid, each of shape
+    (ncol, nrow)."""
+    import numpy as np
+
+    angle = np.radians(geometry["rotation"])
+    u = np.arange(geometry["ncol"]).reshape(-1, 1) * geometry["xinc"]
+    v = (
+        np.arange(geometry["nrow"]).reshape(1, -1)
+        * geometry["yinc"]
+        * geometry["yflip"]
+    )
+    x = geometry["xori"] + u * np.cos(angle) - v * np.sin(angle)
+    y = geometry["yori"] + u * np.sin(angle) + v * np.cos(angle)
+    return x, y
+
+
+def _rasterize_polygon(x, y, ring):
+    """Indices of the nodes at (x, y) inside a polygon ring (npoints, 2),
+    by the even-odd rule. The ring need not be closed explicitly.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: column and row indices
+    """
+    import numpy as np
+
+    xmin, ymin = ring.min(axis=0)
+    xmax, ymax = ring.max(axis=0)
+    # Only nodes inside the bounding box of the ring are tested.
+    ii, jj = np.nonzero((x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax))
+    px, py = x[ii, jj], y[ii, jj]
+    inside = np.zeros(len(ii), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(ring, np.roll(ring, -1, axis=0)):
+        if y1 == y2:
+            continue
+        crosses = (y1 > py) != (y2 > py)
+        inside ^= crosses & (px < x1 + (py - y1) * (x2 - x1) / (y2 - y1))
+    return ii[inside], jj[inside]
+
+
+def _zonal_statistics(values, cells):
+    """Count, mean, std, min and max of the defined values in each zone,
+    given as (column indices, row indices) pairs. Statistics of empty
+    zones are NaN."""
+    import numpy as np
+
+    data = np.ma.getdata(values)
+    mask = np.ma.getmaskarray(values)
+    result = []
+    for ii, jj in cells:
+        zone = data[ii, jj][~mask[ii, jj]]
+        if len(zone) == 0:
+            result.append((0, np.nan, np.nan, np.nan, np.nan))
+        else:
+            result.append(
+                (len(zone), zone.mean(), zone.std(), zone.min(), zone.max())
+            )
+    return result
+
+
+def _bilinear_weights(geometry: Dict, xy):
+    """Node positions and weights for bilinear interpolation at points.
+
+    Args:
+        geometry (dict): grid geometry, see `Surface.geometry`
+        xy: array-like of shape (npoints, 2)
+
+    Returns:
+        Tuple[Tuple[np.ndarray, np.ndarray], np.ndarray, np.ndarray]:
+        column and row indices of the four surrounding nodes and their
+        weights, each of shape (4, npoints), and a mask that is True for
+        points outside the grid.
+    """
+    import numpy as np
+
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    ncol, nrow = geometry["ncol"], geometry["nrow"]
+    angle = np.radians(geometry["rotation"])
+    dx = xy[:, 0] - geometry["xori"]
+    dy = xy[:, 1] - geometry["yori"]
+    # Grid coordinates, in units of nodes, in the unrotated frame.
+    u = (dx * np.cos(angle) + dy * np.sin(angle)) / geometry["xinc"]
+    v = (-dx * np.sin(angle) + dy * np.cos(angle)) / (
+        geometry["yinc"] * geometry["yflip"]
+    )
+    outside = (u < 0) | (u > ncol - 1) | (v < 0) | (v > nrow - 1)
+    i = np.clip(np.floor(u), 0, max(ncol - 2, 0)).astype(np.int64)
+    j = np.clip(np.floor(v), 0, max(nrow - 2, 0)).astype(np.int64)
+    fu = np.clip(u - i, 0.0, 1.0)
+    fv = np.clip(v - j, 0.0, 1.0)
+    i1 = np.minimum(i + 1, ncol - 1)
+    j1 = np.minimum(j + 1, nrow - 1)
+    indices = (np.stack([i, i1, i, i1]), np.stack([j, j, j1, j1]))
+    weights = np.stack(
+        [(1 - fu) * (1 - fv), fu * (1 - fv), (1 - fu) * fv, fu * fv]
+    )
+    return indices, weights, outside
+
+
+def _sample(values, indices, weights, outside):
+    """Interpolate a (ncol, nrow) masked array with precomputed
+    bilinear weights. Points outside the grid or next to an undefined
+    node with non-zero weight are masked."""
+    import numpy as np
+
+    data = np.ma.getdata(values)
+    mask = np.ma.getmaskarray(values)
+    corners = mask[indices] & (weights > 0)
+    result = (np.where(mask[indices], 0.0, data[indices]) * weights).sum(
+        axis=0
+    )
+    return np.ma.MaskedArray(result, mask=outside | corners.any(axis=0))
+
+
+class _RunningStatistics:
+    """Per-node statistics over a stream of equally shaped masked
+    arrays, in memory proportional to the grid size.
+
+    Mean and standard deviation use Welford's running update, min and
+    max are exact. For quantiles, the first _QUANTILE_BUFFER arrays are
+    kept, and quantiles are exact while no more have been added. Beyond
+    that, quantiles are approximated from a fixed-bin histogram per
+    node, interpolated linearly within the bin. Each node's histogram
+    spans the range of its buffered values, widened by half that range
+    on either side, so the bins follow the local spread rather than the
+    spread of the whole grid; values outside the range are counted in
+    the end bins.
+    """
+
+    def __init__(self, operations):
+        for operation in operations:
+            if operation not in ("mean", "std", "min", "max") and (
+                _quantile(operation) is None
+            ):
+                raise ValueError(f"Unknown operation: {operation}")
+        self._operations = operations
+        self._quantiles = any(_quantile(op) is not None for op in operations)
+        self._count = None
+
+    def _allocate(self, values):
+        import numpy as np
+
+        shape = values.shape
+        self._count = np.zeros(shape, dtype=np.int64)
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._min = np.full(shape, np.inf)
+        self._max = np.full(shape, -np.inf)
+        self._buffer = [] if self._quantiles else None
+
+    def _bin(self, data):
+        """Count the defined (non-NaN) values of a flat array in the
+        histogram."""
+        import numpy as np
+
+        nodes = np.flatnonzero(~np.isnan(data))
+        bins = np.clip(
+            np.floor(
+                (data[nodes] - self._low[nodes]) / self._width[nodes]
+            ).astype(np.int64),
+            0,
+            _QUANTILE_BINS - 1,
+        )
+        # Each node is counted once per array, so plain fancy indexing
+        # does not lose increments.
+        self._histogram[nodes, bins] += 1
+
+    def _flush(self):
+        """Set the per-node histogram ranges from the buffered values,
+        and count the buffered values in the histogram."""
+        import warnings
+
+        import numpy as np
+
+        buffered = np.stack(self._buffer)
+        with warnings.catch_warnings():
+            # Nodes with no values yet give all-NaN slices.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low = np.nanmin(buffered, axis=0)
+            high = np.nanmax(buffered, axis=0)
+        empty = np.isnan(low)
+        if empty.all():
+            low[:], high[:] = 0.0, 1.0
+        else:
+            # Nodes without values use the range of the whole grid.
+            low[empty], high[empty] = low[~empty].min(), high[~empty].max()
+        span = high - low
+        # Nodes with a single distinct value get unit-wide bins around
+        # it; the result is clipped to the exact min and max anyway.
+        span[span == 0] = _QUANTILE_BINS / 2
+        self._low = low - span / 2
+        self._width = 2 * span / _QUANTILE_BINS
+        self._histogram = np.zeros(
+            (buffered.shape[1], _QUANTILE_BINS), dtype=np.uint32
+        )
+        for data in buffered:
+            self._bin(data)
+        self._buffer = None
+
+    def add(self, values):
+        """Add one realization; masked nodes are skipped."""
+        import numpy as np
+
+        values = np.ma.asarray(values, dtype=np.float64)
+        if self._count is None:
+            self._allocate(values)
+        elif values.shape != self._count.shape:
+            raise ValueError(
+                f"Expected shape {self._count.shape}; got {values.shape}"
+            )
+        valid = ~np.ma.getmaskarray(values)
+        data = np.where(valid, values.data, 0.0)
+        self._count += valid
+        delta = np.where(valid, data - self._mean, 0.0)
+        self._mean += delta / np.maximum(self._count, 1)
+        self._m2 += delta * (data - self._mean) * valid
+        np.fmin(self._min, np.where(valid, data, np.inf), out=self._min)
+        np.fmax(self._max, np.where(valid, data, -np.inf), out=self._max)
+        if self._quantiles:
+            defined = np.where(valid, data, np.nan).ravel()
+            if self._buffer is None:
+                self._bin(defined)
+            else:
+                self._buffer.append(defined)
+                if len(self._buffer) == _QUANTILE_BUFFER:
+                    self._flush()
+
+    def _exact_quantile(self, q):
+        import warnings
+
+        import numpy as np
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            values = np.nanquantile(np.stack(self._buffer), q, axis=0)
+        return values.reshape(self._count.shape)
+
+    def _approximate_quantile(self, q):
+        import numpy as np
+
+        if self._buffer is not None:
+            return self._exact_quantile(q)
+        cumulative = np.cumsum(self._histogram, axis=1)
+        target = (q * self._count).reshape(-1, 1)
+        index = np.minimum(
+            (cumulative < target).sum(axis=1), _QUANTILE_BINS - 1
+        )
+        rows = np.arange(len(index))
+        inbin = self._histogram[rows, index]
+        below = cumulative[rows, index] - inbin
+        fraction = np.where(
+            inbin > 0, (target[:, 0] - below) / np.maximum(inbin, 1), 0.0
+        )
+        values = self._low + (index + fraction) * self._width
+        return np.clip(values.reshape(self._count.shape), self._min, self._max)
+
+    def result(self, operation):
+        """The statistic for operation as a masked array; nodes with no
+        values are masked."""
+        import numpy as np
+
+        if self._count is None:
+            raise ValueError("No values were added.")
+        if operation == "mean":
+            values = self._mean
+        elif operation == "std":
+            values = np.sqrt(self._m2 / np.maximum(self._count, 1))
+        elif operation == "min":
+            values = self._min
+        elif operation == "max":
+            values = self._max
+        else:
+            values = self._approximate_quantile(_quantile(operation))
+        return np.ma.MaskedArray(values, mask=self._count == 0)
+
 
 class Surface(Child):
     """Class representing a surface object in Sumo"""
@@ -19,6 +400,51 @@ class Surface(Child):
         """
         super().__init__(sumo, metadata, blob)
 
+    @property
+    def geometry(self) -> Dict:
+        """Grid geometry (ncol, nrow, xori, yori, xinc, yinc, yflip and
+        rotation) from data.spec"""
+        spec = self.spec or {}
+        if not all(key in spec for key in _GEOMETRY_KEYS[:6]):
+            return _irap_binary_header(self.blob.getbuffer())
+        geometry = {key: spec.get(key) for key in _GEOMETRY_KEYS}
+        geometry["yflip"] = geometry["yflip"] or 1
+        geometry["rotation"] = geometry["rotation"] or 0.0
+        return geometry
+
+    def _decode_values(self, blob):
+        if self.format not in (None, "irap_binary"):
+            raise TypeError(f"Unknown format: {self.format}")
+        buffer = blob.getbuffer()
+        spec = self.spec or {}
+        if "ncol" in spec and "nrow" in spec:
+            ncol, nrow = spec["ncol"], spec["nrow"]
+        else:
+            header = _irap_binary_header(buffer)
+            ncol, nrow = header["ncol"], header["nrow"]
+        return _irap_binary_values(buffer, ncol, nrow)
+
+    def to_numpy(self):
+        """Get surface values as a numpy array, without xtgeo.
+
+        The blob is decoded directly; use `geometry` for the grid
+        geometry. Only the irap_binary format is supported.
+
+        Returns:
+            np.ma.MaskedArray: values with shape (ncol, nrow), with
+            undefined nodes masked
+        """
+        return self._decode_values(self.blob)
+
+    async def to_numpy_async(self):
+        """Get surface values as a numpy array, without xtgeo.
+
+        Returns:
+            np.ma.MaskedArray: values with shape (ncol, nrow), with
+            undefined nodes masked
+        """
+        return self._decode_values(await self.blob_async)
+
     def to_regular_surface(self):
         """Get surface object as a RegularSurface
 
@@ -1,12 +1,468 @@
 """module containing class for table"""
 
 import logging
-from typing import Dict
+import re
+from io import SEEK_END
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from sumo.wrapper import SumoClient
 
+from fmu.sumo.explorer.cache import LRUCache
+
 from ._child import Child
 
+_PARQUET_MAGIC = b"PAR1"
+_ARROW_FILE_MAGICS = (b"ARROW1", b"FEA1")
+_ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+
+# Inferred csv column types, keyed by (case uuid, ensemble name, table
+# name, content), and widened over all reads; see `_widen_type`.
+_csv_column_types = LRUCache(capacity=100)
+
+# Parquet file metadata (footers), keyed by object uuid.
+_parquet_footers = LRUCache(capacity=1000)
+
+# Number of bytes to read from the end of a parquet blob when fetching
+# the footer; large enough for most footers to need only one request.
+_FOOTER_READ_SIZE = 64 * 1024
+
+
+def _sniff_format(blob) -> str:
+    """Detect the format of a table blob from its magic bytes.
+
+    Parquet files start and end with "PAR1", Arrow IPC files with
+    "ARROW1" (or "FEA1" for feather v1) and Arrow IPC streams with a
+    continuation marker. Anything else is assumed to be csv. The blob
+    is rewound before returning.
+
+    Returns:
+        str: one of "parquet", "arrow", "arrow-stream" or "csv"
+    """
+    blob.seek(0)
+    head = blob.read(8)
+    size = blob.seek(0, SEEK_END)
+    blob.seek(max(size - 4, 0))
+    tail = blob.read(4)
+    blob.seek(0)
+    if head.startswith(_PARQUET_MAGIC) and tail == _PARQUET_MAGIC:
+        return "parquet"
+    if head.startswith(_ARROW_FILE_MAGICS):
+        return "arrow"
+    if head.startswith(_ARROW_STREAM_MAGIC):
+        return "arrow-stream"
+    return "csv"
+
+
+def _widen_type(first, second):
+    """The narrowest type that holds values of two arrow types: integers
+    widen to int64, integers and floats to float64, null to the other
+    type, and anything else to string."""
+    import pyarrow as pa
+
+    if first == second:
+        return first
+    if pa.types.is_null(first):
+        return second
+    if pa.types.is_null(second):
+        return first
+    numeric = [pa.types.is_integer(t) for t in (first, second)]
+    if all(numeric):
+        return pa.int64()
+    if all(
+        is_integer or pa.types.is_floating(t)
+        for is_integer, t in zip(numeric, (first, second))
+    ):
+        return pa.float64()
+    return pa.string()
+
+
+def _filter_expression(filter):
+    """Normalize a row filter to a pyarrow compute expression. Filters
+    in the list-of-tuples form used by pyarrow.parquet are converted."""
+    if filter is None or not isinstance(filter, list):
+        return filter
+    import pyarrow.parquet as pq
+
+    return pq.filters_to_expression(filter)
+
+
+def _filter_and_select(arrowtable, columns, filter):
+    if filter is not None:
+        arrowtable = arrowtable.filter(filter)
+    if columns is not None:
+        arrowtable = arrowtable.select(columns)
+    return arrowtable
+
+
+def _arrow_to_pandas(arrowtable, dtype_backend):
+    if dtype_backend is None:
+        return arrowtable.to_pandas()
+    if dtype_backend == "pyarrow":
+        import pandas as pd
+
+        return arrowtable.to_pandas(types_mapper=pd.ArrowDtype)
+    raise ValueError(f"Unknown dtype_backend: {dtype_backend}")
+
+
+def _constant_column(value, type, length):
+    import pyarrow as pa
+
+    if pa.types.is_string(type):
+        # Store a single copy of the string, and reference it from
+        # every row.
+        return pa.DictionaryArray.from_arrays(
+            pa.repeat(pa.scalar(0, pa.int32()), length),
+            pa.array([value], type),
+        )
+    return pa.repeat(pa.scalar(value, type), length)
+
+
+def _source_columns(table, column_names, length):
+    """ENSEMBLE and REAL columns identifying the object that rows come
+    from, from fmu.ensemble.name and fmu.realization.id. Columns that are
+    missing from the metadata, or already in column_names, are skipped."""
+    import pyarrow as pa
+
+    return [
+        (name, _constant_column(value, type, length))
+        for name, value, type in [
+            ("ENSEMBLE", table.ensemble, pa.string()),
+            ("REAL", table.realization, pa.int64()),
+        ]
+        if value is not None and name not in column_names
+    ]
+
+
+def _unify_types(arrowtables):
+    """Cast the columns of arrow tables to common types, widened with
+    `_widen_type`; e.g. a column read as int64 from one csv table and as
+    double from another becomes double in both. Only columns whose type
+    changes are cast."""
+    types = {}
+    for arrowtable in arrowtables:
+        for field in arrowtable.schema:
+            types[field.name] = _widen_type(
+                types.get(field.name, field.type), field.type
+            )
+    unified = []
+    for arrowtable in arrowtables:
+        for index, field in enumerate(arrowtable.schema):
+            if field.type != types[field.name]:
+                arrowtable = arrowtable.set_column(
+                    index,
+                    field.name,
+                    arrowtable.column(index).cast(types[field.name]),
+                )
+        unified.append(arrowtable)
+    return unified
+
+
+def _stack_tables(tables, arrowtables):
+    """Concatenate the arrow tables for a list of Table objects.
+
+    ENSEMBLE and REAL columns are added, unless the tables already have
+    them. Column types that differ between tables are widened, see
+    `_unify_types`, and null columns are added where a table lacks a
+    column; other column data is not copied. An empty list of tables
+    gives an empty table.
+    """
+    import pyarrow as pa
+
+    if len(tables) == 0:
+        return pa.table({})
+    parts = []
+    for table, arrowtable in zip(tables, arrowtables):
+        for position, (name, array) in enumerate(
+            _source_columns(
+                table, arrowtable.column_names, arrowtable.num_rows
+            )
+        ):
+            arrowtable = arrowtable.add_column(position, name, array)
+        parts.append(arrowtable)
+    return pa.concat_tables(_unify_types(parts), promote_options="default")
+
+
+def _merge_collections(arrowtables, columns, keys):
+    """Merge single-column collection tables into one table.
+
+    Each of arrowtables holds the key columns plus the corresponding
+    entry in columns. When the key columns are identical across tables
+    (the usual case, since all collections are made from the same
+    realizations) the value columns are appended without copying;
+    otherwise the tables are joined on the keys.
+    """
+    merged = arrowtables[0].select(keys + [columns[0]])
+    for column, arrowtable in zip(columns[1:], arrowtables[1:]):
+        if merged.select(keys).equals(arrowtable.select(keys)):
+            merged = merged.append_column(column, arrowtable[column])
+        else:
+            merged = merged.join(
+                arrowtable.select(keys + [column]),
+                keys=keys,
+                join_type="full outer",
+            ).sort_by([(key, "ascending") for key in keys])
+    return merged
+
+
+def _resolve_context_columns(tables, columns, index):
+    """Resolve column names and patterns against the union of
+    data.spec.columns for tables, in first-seen order. The index column
+    is never included."""
+    available = dict.fromkeys(
+        c for table in tables for c in (table.columns or []) if c != index
+    )
+    if columns is None:
+        return list(available)
+    if isinstance(columns, str):
+        columns = [columns]
+    resolved = {}
+    for column in columns:
+        if column in available:
+            matches = [column]
+        else:
+            pattern = re.compile(column)
+            matches = [c for c in available if pattern.fullmatch(c)]
+        if len(matches) == 0:
+            raise ValueError(f"No columns in tables match {column}.")
+        resolved.update(dict.fromkeys(matches))
+    return list(resolved)
+
+
+def _realization_array(tables, arrowtables, columns, index):
+    """Align tables on their index column in a realization x index x
+    column masked array.
+
+    The index axis is the sorted union of the index values; the array is
+    allocated once and filled table by table. Values missing from a
+    table, including null values, are masked.
+    """
+    import numpy as np
+    import pyarrow.compute as pc
+
+    realizations = [table.realization for table in tables]
+    if None in realizations or len(set(realizations)) != len(tables):
+        raise ValueError("Expected exactly one table per realization.")
+    order = np.argsort(realizations)
+    steps = np.unique(
+        np.concatenate(
+            [
+                arrowtable[index].to_numpy(zero_copy_only=False)
+                for arrowtable in arrowtables
+            ]
+        )
+    )
+    shape = (len(tables), len(steps), len(columns))
+    values = np.full(shape, np.nan)
+    mask = np.ones(shape, dtype=bool)
+    for row, i in enumerate(order):
+        arrowtable = arrowtables[i]
+        positions = np.searchsorted(
+            steps, arrowtable[index].to_numpy(zero_copy_only=False)
+        )
+        names = set(arrowtable.column_names)
+        for j, column in enumerate(columns):
+            if column not in names:
+                continue
+            data = arrowtable[column]
+            values[row, positions, j] = data.to_numpy(zero_copy_only=False)
+            mask[row, positions, j] = pc.is_null(data).to_numpy(
+                zero_copy_only=False
+            )
+    coords = {
+        "REAL": np.asarray(realizations)[order],
+        index: steps,
+        "column": np.asarray(columns),
+    }
+    return np.ma.MaskedArray(values, mask=mask), coords
+
+
+def _label_batch(table, batch):
+    """Add ENSEMBLE and REAL columns to a record batch from a table."""
+    import pyarrow as pa
+
+    labels = _source_columns(table, batch.schema.names, batch.num_rows)
+    if len(labels) == 0:
+        return batch
+    return pa.RecordBatch.from_arrays(
+        [array for _, array in labels] + batch.columns,
+        names=[name for name, _ in labels] + batch.schema.names,
+    )
+
+
+def _widened_schema(schema):
+    """Schema for batches from many tables, set up from the schema of the
+    first one before the others are seen. Dictionary columns are given
+    as plain values, since dictionaries differ between tables, and
+    integer columns other than REAL as float64, since a later table may
+    hold decimals in the same column (e.g. csv tables, whose types are
+    inferred per table)."""
+    import pyarrow as pa
+
+    def widened(field):
+        if pa.types.is_dictionary(field.type):
+            return field.with_type(field.type.value_type)
+        if pa.types.is_integer(field.type) and field.name != "REAL":
+            return field.with_type(pa.float64())
+        return field
+
+    return pa.schema([widened(field) for field in schema])
+
+
+def _align_batch(batch, schema):
+    """Conform a record batch to schema: columns are reordered and cast,
+    missing columns are filled with nulls and extra columns dropped."""
+    import pyarrow as pa
+
+    names = set(batch.schema.names)
+    arrays = []
+    for field in schema:
+        if field.name not in names:
+            arrays.append(pa.nulls(batch.num_rows, field.type))
+            continue
+        column = batch.column(field.name)
+        try:
+            arrays.append(column.cast(field.type))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as ex:
+            raise ValueError(
+                f"Column {field.name} of type {column.type} does not fit "
+                f"the type {field.type} set up from the first table."
+            ) from ex
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _ipc_file_batches(blob):
+    import pyarrow as pa
+    import pyarrow.feather as pf
+
+    try:
+        reader = pa.ipc.open_file(pa.BufferReader(blob.getbuffer()))
+    except pa.ArrowInvalid:
+        # Feather v1 files are not IPC files.
+        yield from pf.read_table(blob).to_batches()
+        return
+    for index in range(reader.num_record_batches):
+        yield reader.get_batch(index)
+
+
+def _footer_size(tail: bytes) -> int:
+    """Size of the parquet footer, including the trailing length and
+    magic, given the last bytes of a parquet file. Returns 0 if this is
+    not a parquet file."""
+    if len(tail) < 8 or tail[-4:] != _PARQUET_MAGIC:
+        return 0
+    return int.from_bytes(tail[-8:-4], "little") + 8
+
+
+def _parse_footer(tail: bytes):
+    """Parse parquet metadata from the footer at the end of tail."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    footer = tail[-_footer_size(tail) :]
+    # The reader only looks at the footer, so the data pages can be
+    # left out as long as the file starts with the magic bytes.
+    return pq.read_metadata(pa.BufferReader(_PARQUET_MAGIC + footer))
+
+
+def _statistics_from_footer(metadata, columns):
+    chunks = {}
+    for rg in range(metadata.num_row_groups):
+        rowgroup = metadata.row_group(rg)
+        for index in range(rowgroup.num_columns):
+            chunk = rowgroup.column(index)
+            if columns is None or chunk.path_in_schema in columns:
+                chunks.setdefault(chunk.path_in_schema, []).append(
+                    chunk.statistics
+                )
+
+    def combine(stats, attr, flag, fn):
+        if any(s is None or not getattr(s, flag) for s in stats):
+            return None
+        return fn(getattr(s, attr) for s in stats)
+
+    return {
+        name: {
+            "min": combine(stats, "min", "has_min_max", min),
+            "max": combine(stats, "max", "has_min_max", max),
+            "null_count": combine(stats, "null_count", "has_null_count", sum),
+        }
+        for name, stats in chunks.items()
+    }
+
+
+def _statistics_from_arrow(arrowtable, columns):
+    import pyarrow.compute as pc
+
+    stats = {}
+    for name in arrowtable.column_names:
+        if columns is not None and name not in columns:
+            continue
+        column = arrowtable.column(name)
+        try:
+            minmax = pc.min_max(column).as_py()
+        except NotImplementedError:
+            minmax = {"min": None, "max": None}
+        stats[name] = {
+            "min": minmax["min"],
+            "max": minmax["max"],
+            "null_count": column.null_count,
+        }
+    return stats
+
+
+class _IpcFileWriter:
+    """Write tables to one Arrow IPC file as they arrive, labelled with
+    ENSEMBLE and REAL columns. The schema is set up from the first table
+    written, see `_widened_schema`, and later tables are conformed to
+    it, see `_align_batch`. Dictionary columns, such as ENSEMBLE, are
+    written as plain values, since the IPC file format does not allow a
+    dictionary to change between batches."""
+
+    def __init__(self, path):
+        self._path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, table, arrowtable):
+        import pyarrow as pa
+
+        for batch in arrowtable.to_batches():
+            batch = _label_batch(table, batch)
+            if self._writer is None:
+                self._schema = _widened_schema(batch.schema)
+                self._writer = pa.ipc.new_file(self._path, self._schema)
+            self._writer.write_batch(_align_batch(batch, self._schema))
+
+    def close(self):
+        import pyarrow as pa
+
+        if self._writer is None:
+            self._writer = pa.ipc.new_file(self._path, pa.schema([]))
+        self._writer.close()
+
+
+def _write_ipc_partition(directory, table, arrowtable):
+    """Write one table to directory/ENSEMBLE=<name>/REAL=<id>/<uuid>.arrow,
+    a hive style layout that pyarrow.dataset reads back with ENSEMBLE
+    and REAL columns. Columns are widened as in `_widened_schema`, so
+    that the files of a dataset agree on the column types."""
+    import pyarrow as pa
+
+    parts = [
+        f"{name}={value}"
+        for name, value in [
+            ("ENSEMBLE", table.ensemble),
+            ("REAL", table.realization),
+        ]
+        if value is not None
+    ]
+    path = Path(directory, *parts, f"{table.uuid}.arrow")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrowtable = arrowtable.cast(_widened_schema(arrowtable.schema))
+    with pa.ipc.new_file(path, arrowtable.schema) as writer:
+        writer.write_table(arrowtable)
+
 
 class Table(Child):
     """Class representing a table object in Sumo"""
@@ -18,7 +474,6 @@ class Table(Child):
             metadata: (dict): child object metadata
         """
         super().__init__(sumo, metadata, blob)
-        self._dataframe = None
         self._arrowtable = None
         self._logger = logging.getLogger("__name__" + ".Table")
 
@@ -32,122 +487,508 @@ class Table(Child):
             self._blob = await self.blob_async
         return self._blob
 
-    def _read_table(self):
-        return self._construct_table_from_blob(self._get_blob())
+    def _resolve_columns(self, columns) -> Optional[List[str]]:
+        """Resolve column names and regular expressions against
+        data.spec.columns, without downloading the table.
 
-    async def _read_table_async(self):
-        return self._construct_table_from_blob(await self._get_blob_async())
+        Each entry is first matched exactly against the column names;
+        if that fails it is used as a regular expression that must match
+        the full column name.
 
-    def _construct_table_from_blob(self, blob):
-        import pandas as pd
+        Args:
+            columns (str | List[str]): column names or patterns
+
+        Returns:
+            List[str]: the matching column names, or None if no
+            projection was requested.
+        """
+        if columns is None:
+            return None
+        if isinstance(columns, str):
+            columns = [columns]
+        available = self.columns
+        if available is None:
+            return list(columns)
+        known = set(available)
+        resolved = {}
+        unmatched = []
+        for column in columns:
+            if column in known:
+                matches = [column]
+            else:
+                pattern = re.compile(column)
+                matches = [c for c in available if pattern.fullmatch(c)]
+            if len(matches) == 0:
+                unmatched.append(column)
+            resolved.update(dict.fromkeys(matches))
+        if len(unmatched) > 0:
+            raise ValueError(
+                f"No columns in table {self.name} match {unmatched}."
+            )
+        return list(resolved)
+
+    def _detect_format(self, blob):
+        fmt = _sniff_format(blob)
+        declared = "arrow" if fmt == "arrow-stream" else fmt
+        if declared != self.dataformat:
+            self._logger.warning(
+                "Table %s is declared as %s, but the blob looks like %s.",
+                self.uuid,
+                self.dataformat,
+                declared,
+            )
+        return fmt
+
+    def _read_arrow(self, columns=None, filter=None):
+        return self._construct_arrow_from_blob(
+            self._get_blob(), columns, filter
+        )
+
+    async def _read_arrow_async(self, columns=None, filter=None):
+        return self._construct_arrow_from_blob(
+            await self._get_blob_async(), columns, filter
+        )
+
+    def _csv_types_key(self):
+        return (self.caseuuid, self.ensemble, self.name, self.content)
+
+    def _read_csv(self, blob, columns=None):
+        """Parse a csv blob with the multithreaded arrow csv reader.
+
+        Column types inferred for a table are cached per case, ensemble,
+        table name and content, widened over all instances read (e.g.
+        other realizations). Cached integer types are passed to the
+        reader, so those columns are not inferred again: a forced integer
+        read that succeeds gives the type inference would give, and one
+        that fails is read again with inference. Other cached types are
+        not forced, since they could change the result (a float type
+        would turn a column of integers into floats), so the type of each
+        column depends only on the content of the blob.
+        """
+        import pyarrow as pa
+        import pyarrow.csv as pv
+
+        key = self._csv_types_key()
+        known = _csv_column_types.get(key) or {}
+        forced = {
+            name: type
+            for name, type in known.items()
+            if pa.types.is_integer(type)
+        }
+        read_options = pv.ReadOptions(use_threads=True)
+        try:
+            arrowtable = pv.read_csv(
+                blob,
+                read_options=read_options,
+                convert_options=pv.ConvertOptions(
+                    column_types=forced, include_columns=columns
+                ),
+            )
+        except pa.ArrowInvalid:
+            if len(forced) == 0:
+                raise
+            blob.seek(0)
+            forced = {}
+            arrowtable = pv.read_csv(
+                blob,
+                read_options=read_options,
+                convert_options=pv.ConvertOptions(include_columns=columns),
+            )
+        for index, name in enumerate(arrowtable.column_names):
+            column = arrowtable.column(index)
+            if name in forced and column.null_count == len(column):
+                # Inference gives the null type for empty columns.
+                arrowtable = arrowtable.set_column(
+                    index, name, pa.nulls(len(column))
+                )
+        widened = dict(known)
+        for name, type in zip(
+            arrowtable.column_names, arrowtable.schema.types
+        ):
+            widened[name] = _widen_type(widened.get(name, type), type)
+        if widened != known:
+            _csv_column_types.put(key, widened)
+        return arrowtable
+
+    def _construct_arrow_from_blob(self, blob, columns=None, filter=None):
+        import pyarrow as pa
         import pyarrow.feather as pf
+        import pyarrow.parquet as pq
 
+        fmt = self._detect_format(blob)
         try:
-            if self.dataformat == "csv":
-                dataframe = pd.read_csv(blob)
-            elif self.dataformat == "parquet":
-                dataframe = pd.read_parquet(blob)
-            elif self.dataformat == "arrow":
-                dataframe = pf.read_feather(blob)
+            if fmt == "parquet":
+                # Row groups whose statistics cannot satisfy the filter
+                # are skipped without being decoded.
+                return pq.read_table(blob, columns=columns, filters=filter)
+            if fmt == "arrow":
+                arrowtable = pf.read_table(
+                    blob, columns=columns if filter is None else None
+                )
+            elif fmt == "arrow-stream":
+                arrowtable = pa.ipc.open_stream(blob).read_all()
             else:
-                raise TypeError(
-                    f"Don't know how to convert a blob of format {self.dataformat} to a pandas table."
+                arrowtable = self._read_csv(
+                    blob, columns if filter is None else None
                 )
-        except Exception:
-            try:
-                dataframe = pd.read_csv(blob)
-            except Exception:
-                try:
-                    dataframe = pd.read_parquet(blob)
-                except Exception:
-                    try:
-                        dataframe = pf.read_feather(blob)
-                    except Exception:
-                        raise TypeError(
-                            f"Unable to convert a blob of format {self.dataformat} to pandas table; tried csv, parquet and feather."
-                        )
-                    pass
-                pass
-            pass
-        return dataframe
-
-    def to_pandas(self):
+        except Exception as ex:
+            raise TypeError(
+                f"Unable to convert a blob of format {self.dataformat} to arrow; detected {fmt}."
+            ) from ex
+        finally:
+            blob.seek(0)
+        return _filter_and_select(arrowtable, columns, filter)
+
+    def to_arrow(self, columns=None, filter=None):
+        """Return object as an arrow Table
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names. If given, only these
+              columns are decoded.
+            filter (pc.Expression | List[Tuple]): row filter, either as
+              a pyarrow compute expression or in the list-of-tuples
+              form accepted by pyarrow.parquet. For parquet tables, row
+              groups that cannot match are skipped using their
+              statistics.
+
+        Returns:
+            pa.Table: _description_
+
+        Examples:
+            Read FOPT for dates from 2020 onwards::
+
+                import pyarrow.compute as pc
+
+                table.to_arrow(
+                    columns=["DATE", "FOPT"],
+                    filter=pc.field("DATE") >= pd.Timestamp("2020-01-01"),
+                )
+        """
+        columns = self._resolve_columns(columns)
+        filter = _filter_expression(filter)
+        if self._arrowtable is not None:
+            return _filter_and_select(self._arrowtable, columns, filter)
+        if columns is not None or filter is not None:
+            return self._read_arrow(columns, filter)
+        self._arrowtable = self._read_arrow()
+        return self._arrowtable
+
+    async def to_arrow_async(self, columns=None, filter=None):
+        """Return object as an arrow Table
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names. If given, only these
+              columns are decoded.
+            filter (pc.Expression | List[Tuple]): row filter, either as
+              a pyarrow compute expression or in the list-of-tuples
+              form accepted by pyarrow.parquet. For parquet tables, row
+              groups that cannot match are skipped using their
+              statistics.
+
+        Returns:
+            pa.Table: _description_
+        """
+        columns = self._resolve_columns(columns)
+        filter = _filter_expression(filter)
+        if self._arrowtable is not None:
+            return _filter_and_select(self._arrowtable, columns, filter)
+        if columns is not None or filter is not None:
+            return await self._read_arrow_async(columns, filter)
+        self._arrowtable = await self._read_arrow_async()
+        return self._arrowtable
+
+    def to_pandas(self, columns=None, filter=None, dtype_backend=None):
         """Return object as a pandas DataFrame
 
+        The DataFrame is derived from the (cached) arrow table, so the
+        blob is only decoded once even if both `to_arrow` and
+        `to_pandas` are used.
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names. If given, only these
+              columns are decoded.
+            filter (pc.Expression | List[Tuple]): row filter; see
+              `to_arrow`.
+            dtype_backend (str): None for numpy dtypes, or "pyarrow"
+              for arrow-backed dtypes, which avoids copying the data.
+
         Returns:
             DataFrame: A DataFrame object
         """
-        if self._dataframe is None:
-            self._dataframe = self._read_table()
-        return self._dataframe
+        return _arrow_to_pandas(self.to_arrow(columns, filter), dtype_backend)
 
-    async def to_pandas_async(self):
+    async def to_pandas_async(
+        self, columns=None, filter=None, dtype_backend=None
+    ):
         """Return object as a pandas DataFrame
 
+        The DataFrame is derived from the (cached) arrow table, so the
+        blob is only decoded once even if both `to_arrow` and
+        `to_pandas` are used.
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names. If given, only these
+              columns are decoded.
+            filter (pc.Expression | List[Tuple]): row filter; see
+              `to_arrow`.
+            dtype_backend (str): None for numpy dtypes, or "pyarrow"
+              for arrow-backed dtypes, which avoids copying the data.
+
         Returns:
             DataFrame: A DataFrame object
         """
-        if self._dataframe is None:
-            self._dataframe = await self._read_table_async()
-        return self._dataframe
+        return _arrow_to_pandas(
+            await self.to_arrow_async(columns, filter), dtype_backend
+        )
 
-    def _read_arrow(self):
-        return self._construct_arrow_from_blob(self._get_blob())
+    def to_polars(self, columns=None, filter=None):
+        """Return object as a polars DataFrame. The DataFrame shares
+        memory with the (cached) arrow table.
 
-    async def _read_arrow_async(self):
-        return self._construct_arrow_from_blob(await self._get_blob_async())
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names; see `to_arrow`.
+            filter (pc.Expression | List[Tuple]): row filter; see
+              `to_arrow`.
 
-    def _construct_arrow_from_blob(self, blob):
-        import pandas as pd
+        Returns:
+            pl.DataFrame: A polars DataFrame
+        """
+        try:
+            import polars as pl
+        except ModuleNotFoundError:
+            raise RuntimeError(
+                "Unable to import polars; probably not installed."
+            )
+        return pl.from_arrow(self.to_arrow(columns, filter))
+
+    async def to_polars_async(self, columns=None, filter=None):
+        """Return object as a polars DataFrame. The DataFrame shares
+        memory with the (cached) arrow table.
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names; see `to_arrow`.
+            filter (pc.Expression | List[Tuple]): row filter; see
+              `to_arrow`.
+
+        Returns:
+            pl.DataFrame: A polars DataFrame
+        """
+        try:
+            import polars as pl
+        except ModuleNotFoundError:
+            raise RuntimeError(
+                "Unable to import polars; probably not installed."
+            )
+        return pl.from_arrow(await self.to_arrow_async(columns, filter))
+
+    def _csv_stream_types(self, blob):
+        """Column types for streaming a csv blob. The streaming reader
+        infers types from the first block only, so a column could fail
+        to convert further down. The inferred types are widened with the
+        cached types for the table (see `_read_csv`), integer columns
+        other than REAL are read as float64 and null columns as
+        string."""
         import pyarrow as pa
-        import pyarrow.feather as pf
+        import pyarrow.csv as pv
+
+        schema = pv.open_csv(
+            blob, read_options=pv.ReadOptions(use_threads=True)
+        ).schema
+        blob.seek(0)
+        known = _csv_column_types.get(self._csv_types_key()) or {}
+        types = {}
+        for field in schema:
+            type = _widen_type(known.get(field.name, field.type), field.type)
+            if pa.types.is_integer(type) and field.name != "REAL":
+                type = pa.float64()
+            elif pa.types.is_null(type):
+                type = pa.string()
+            types[field.name] = type
+        return types
+
+    def iter_batches(self, batch_size=65536, columns=None):
+        """Iterate over the table as arrow record batches, without
+        decoding the whole table at once.
+
+        Csv tables are streamed with integer columns as float64 and empty
+        columns as string, since the types are inferred before the whole
+        table has been seen; see `_csv_stream_types`.
+
+        Args:
+            batch_size (int): max number of rows per batch
+            columns (str | List[str]): column names or regular
+              expressions for column names; see `to_arrow`.
+
+        Yields:
+            pa.RecordBatch: the batches of the table
+        """
+        import pyarrow as pa
+        import pyarrow.csv as pv
         import pyarrow.parquet as pq
 
+        columns = self._resolve_columns(columns)
+        if self._arrowtable is not None:
+            yield from _filter_and_select(
+                self._arrowtable, columns, None
+            ).to_batches(batch_size)
+            return
+        blob = self._get_blob()
+        fmt = self._detect_format(blob)
         try:
-            if self.dataformat == "csv":
-                arrowtable = pa.Table.from_pandas(pd.read_csv(blob))
-            elif self.dataformat == "parquet":
-                arrowtable = pq.read_table(blob)
-            elif self.dataformat == "arrow":
-                arrowtable = pf.read_table(blob)
+            if fmt == "parquet":
+                batches = pq.ParquetFile(blob).iter_batches(
+                    batch_size, columns=columns
+                )
+            elif fmt == "arrow":
+                batches = _ipc_file_batches(blob)
+            elif fmt == "arrow-stream":
+                batches = pa.ipc.open_stream(blob)
             else:
-                raise TypeError(
-                    f"Don't know how to convert a blob of format {self.dataformat} to a pandas table."
+                batches = pv.open_csv(
+                    blob,
+                    read_options=pv.ReadOptions(use_threads=True),
+                    convert_options=pv.ConvertOptions(
+                        column_types=self._csv_stream_types(blob),
+                        include_columns=columns,
+                    ),
                 )
-        except Exception:
+            for batch in batches:
+                if columns is not None:
+                    batch = batch.select(columns)
+                for offset in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(offset, batch_size)
+        finally:
+            blob.seek(0)
+
+    def _footer(self):
+        if self._blob is not None:
+            if _sniff_format(self._blob) != "parquet":
+                return None
+            import pyarrow.parquet as pq
+
             try:
-                arrowtable = pa.Table.from_pandas(pd.read_csv(blob))
-            except Exception:
-                try:
-                    arrowtable = pq.read_table(blob)
-                except Exception:
-                    try:
-                        arrowtable = pf.read_table(blob)
-                    except Exception:
-                        raise TypeError(
-                            f"Unable to convert a blob of format {self.dataformat} to arrow; tried csv, parquet and feather."
-                        )
-                    pass
-                pass
-            pass
-        return arrowtable
+                return pq.read_metadata(self._blob)
+            finally:
+                self._blob.seek(0)
+        if self.dataformat != "parquet":
+            return None
+        footer = _parquet_footers.get(self.uuid)
+        if footer is None:
+            tail, _ = self._read_blob_tail(_FOOTER_READ_SIZE)
+            size = _footer_size(tail)
+            if size == 0:
+                return None
+            if size > len(tail):
+                tail, _ = self._read_blob_tail(size)
+            footer = _parse_footer(tail)
+            _parquet_footers.put(self.uuid, footer)
+        return footer
 
-    def to_arrow(self):
-        """Return object as an arrow Table
+    async def _footer_async(self):
+        if self._blob is not None or self.dataformat != "parquet":
+            return self._footer()
+        footer = _parquet_footers.get(self.uuid)
+        if footer is None:
+            tail, _ = await self._read_blob_tail_async(_FOOTER_READ_SIZE)
+            size = _footer_size(tail)
+            if size == 0:
+                return None
+            if size > len(tail):
+                tail, _ = await self._read_blob_tail_async(size)
+            footer = _parse_footer(tail)
+            _parquet_footers.put(self.uuid, footer)
+        return footer
+
+    def schema(self):
+        """Return the arrow schema of the table. For parquet tables only
+        the file footer is read, with a ranged request.
 
         Returns:
-            pa.Table: _description_
+            pa.Schema: the schema
         """
-        if self._arrowtable is None:
-            self._arrowtable = self._read_arrow()
-        return self._arrowtable
+        footer = self._footer()
+        if footer is None:
+            return self.to_arrow().schema
+        return footer.schema.to_arrow_schema()
 
-    async def to_arrow_async(self):
-        """Return object as an arrow Table
+    async def schema_async(self):
+        """Return the arrow schema of the table. For parquet tables only
+        the file footer is read, with a ranged request.
 
         Returns:
-            pa.Table: _description_
+            pa.Schema: the schema
         """
-        if self._arrowtable is None:
-            self._arrowtable = await self._read_arrow_async()
-        return self._arrowtable
+        footer = await self._footer_async()
+        if footer is None:
+            return (await self.to_arrow_async()).schema
+        return footer.schema.to_arrow_schema()
+
+    def num_rows(self) -> int:
+        """Return the number of rows in the table. For parquet tables
+        only the file footer is read, with a ranged request.
+
+        Returns:
+            int: the number of rows
+        """
+        footer = self._footer()
+        if footer is None:
+            return self.to_arrow().num_rows
+        return footer.num_rows
+
+    async def num_rows_async(self) -> int:
+        """Return the number of rows in the table. For parquet tables
+        only the file footer is read, with a ranged request.
+
+        Returns:
+            int: the number of rows
+        """
+        footer = await self._footer_async()
+        if footer is None:
+            return (await self.to_arrow_async()).num_rows
+        return footer.num_rows
+
+    def column_statistics(self, columns=None) -> Dict[str, Dict]:
+        """Return min, max and null count per column. For parquet tables
+        these are taken from the row group statistics in the file footer,
+        which is read with a ranged request; min and max are None for
+        columns where some row group lacks statistics.
+
+        Args:
+            columns (str | List[str]): column names or regular
+              expressions for column names; see `to_arrow`.
+
+        Returns:
+            Dict[str, Dict]: mapping from column name to a dictionary
+            with keys "min", "max" and "null_count".
+        """
+        columns = self._resolve_columns(columns)
+        footer = self._footer()
+        if footer is None:
+            return _statistics_from_arrow(self.to_arrow(), columns)
+        return _statistics_from_footer(footer, columns)
+
+    async def column_statistics_async(self, columns=None) -> Dict[str, Dict]:
+        """Return min, max and null count per column; see
+        `column_statistics`.
+
+        Returns:
+            Dict[str, Dict]: mapping from column name to a dictionary
+            with keys "min", "max" and "null_count".
+        """
+        columns = self._resolve_columns(columns)
+        footer = await self._footer_async()
+        if footer is None:
+            return _statistics_from_arrow(await self.to_arrow_async(), columns)
+        return _statistics_from_footer(footer, columns)
+
+    def release(self):
+        """Release the cached blob and decoded table for this object.
+        They will be fetched and decoded again on next use."""
+        super().release()
+        self._arrowtable = None
@@ -0,0 +1,109 @@
+"""In-memory spatial index over object bounding boxes"""
+
+import math
+from typing import List, Sequence, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+
+def _str_order(bboxes, node_size: int):
+    """Sort-Tile-Recursive ordering of bounding boxes: the boxes are
+    sorted into vertical slices by x center, and by y center within each
+    slice, so that consecutive runs of node_size boxes are compact."""
+    import numpy as np
+
+    count = len(bboxes)
+    leaves = math.ceil(count / node_size)
+    slices = max(math.ceil(math.sqrt(leaves)), 1)
+    per_slice = slices * node_size
+    xcenter = bboxes[:, 0] + bboxes[:, 2]
+    ycenter = bboxes[:, 1] + bboxes[:, 3]
+    order = np.argsort(xcenter, kind="stable")
+    for start in range(0, count, per_slice):
+        part = order[start : start + per_slice]
+        order[start : start + per_slice] = part[
+            np.argsort(ycenter[part], kind="stable")
+        ]
+    return order
+
+
+class BBoxIndex:
+    """A static R-tree over axis-aligned bounding boxes, packed with the
+    Sort-Tile-Recursive algorithm and stored as numpy arrays, one per
+    tree level. Queries descend the tree level by level, testing all
+    candidate nodes of a level at once.
+
+    Bounding boxes are given as (xmin, ymin, xmax, ymax).
+
+    Examples:
+        Find surfaces overlapping a map view::
+
+            index = case.surfaces.bbox_index()
+            uuids = index.query((456000, 5930000, 460000, 5934000))
+            surfs = case.surfaces.filter(id=uuids)
+    """
+
+    def __init__(
+        self, keys: Sequence, bboxes: Sequence[BBox], node_size: int = 16
+    ):
+        """
+        Args:
+            keys: key (e.g. object uuid) for each bounding box
+            bboxes: one (xmin, ymin, xmax, ymax) per key
+            node_size: number of children per tree node
+        """
+        import numpy as np
+
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        if len(keys) != len(bboxes):
+            raise ValueError(
+                f"Got {len(keys)} keys and {len(bboxes)} bounding boxes."
+            )
+        self._node_size = node_size
+        order = _str_order(bboxes, node_size)
+        self._keys = [keys[i] for i in order]
+        levels = [bboxes[order]]
+        while len(levels[-1]) > node_size:
+            below = levels[-1]
+            starts = np.arange(0, len(below), node_size)
+            levels.append(
+                np.hstack(
+                    [
+                        np.minimum.reduceat(below[:, :2], starts),
+                        np.maximum.reduceat(below[:, 2:], starts),
+                    ]
+                )
+            )
+        self._levels = levels[::-1]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def query(self, bbox: BBox) -> List:
+        """Keys of the bounding boxes that intersect an area.
+
+        Args:
+            bbox: the area, as (xmin, ymin, xmax, ymax)
+
+        Returns:
+            List: the matching keys, in index order
+        """
+        import numpy as np
+
+        xmin, ymin, xmax, ymax = bbox
+        candidates = np.arange(len(self._levels[0]))
+        for depth, level in enumerate(self._levels):
+            boxes = level[candidates]
+            candidates = candidates[
+                (boxes[:, 0] <= xmax)
+                & (boxes[:, 2] >= xmin)
+                & (boxes[:, 1] <= ymax)
+                & (boxes[:, 3] >= ymin)
+            ]
+            if depth + 1 < len(self._levels):
+                children = (
+                    candidates[:, None] * self._node_size
+                    + np.arange(self._node_size)
+                ).ravel()
+                candidates = children[children < len(self._levels[depth + 1])]
+        return [self._keys[i] for i in candidates]
@@ -0,0 +1,92 @@
+"""Test caches.
+
+* SasCache
+
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+from fmu.sumo.explorer.cache import SasCache
+
+BASEURI = "https://account.blob.core.windows.net/container/"
+
+
+def _sas(minutes, scope="c"):
+    expiry = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    return f"sv=2021&sr={scope}&se=" + quote(
+        expiry.strftime("%Y-%m-%dT%H:%M:%SZ")
+    )
+
+
+def test_sas_cache_shares_container_tokens():
+    """Test that a container scoped token is used for other objects in
+    the same scope, and that object tokens are kept apart."""
+    cache = SasCache(margin=60)
+    cache.put("a", BASEURI + "a", _sas(30), "case")
+    assert cache.get("a", "case") == (BASEURI + "a", _sas(30))
+    assert cache.get("b", "case") == (BASEURI + "b", _sas(30))
+    assert cache.get("b", "other") is None
+    assert cache.get("b") is None
+
+
+def test_sas_cache_keeps_blob_tokens_per_object():
+    """Test that blob scoped tokens are only used for their object."""
+    cache = SasCache(margin=60)
+    cache.put("a", BASEURI + "a", _sas(30, "b"), "case")
+    cache.put("b", BASEURI + "b", _sas(40, "b"), "case")
+    assert cache.get("a", "case") == (BASEURI + "a", _sas(30, "b"))
+    assert cache.get("c", "case") is None
+
+
+def test_sas_cache_expiry():
+    """Test that tokens close to expiry, or without expiry, are not
+    used."""
+    cache = SasCache(margin=600)
+    cache.put("a", BASEURI + "a", _sas(5))
+    assert cache.get("a") is None
+    cache.put("b", BASEURI + "b", "sv=2021")
+    assert cache.get("b") is None
+
+
+def test_sas_cache_refresh_async():
+    """Test that a due token is refreshed once in the background."""
+    cache = SasCache(margin=60, refresh_ahead=900)
+    cache.put("a", BASEURI + "a", _sas(10))
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return BASEURI + "a", _sas(60)
+
+    async def run():
+        assert cache.due("a")
+        cache.refresh_async("a", fetch)
+        cache.refresh_async("a", fetch)
+        await asyncio.gather(*cache.refreshing.values())
+
+    asyncio.run(run())
+    assert len(calls) == 1
+    assert not cache.due("a")
+
+
+def test_sas_cache_refresh_failure_logged(caplog):
+    """Test that a failed background refresh is logged, and the cached
+    token kept."""
+    cache = SasCache(margin=60, refresh_ahead=900)
+    cache.put("a", BASEURI + "a", _sas(10))
+
+    async def fetch():
+        raise RuntimeError("authuri unavailable")
+
+    async def run():
+        cache.refresh_async("a", fetch)
+        await asyncio.gather(*cache.refreshing.values())
+
+    with caplog.at_level(logging.WARNING):
+        asyncio.run(run())
+    assert "Failed to refresh SAS token for a" in caplog.text
+    assert cache.refreshing == {}
+    assert cache.get("a") is not None
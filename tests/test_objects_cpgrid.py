@@ -0,0 +1,231 @@
+"""Test grid objects.
+
+* Property to grid resolution
+* Realization-stacked property arrays
+* Loading a grid with its properties
+* Geometry cache
+
+"""
+
+import numpy as np
+import pytest
+from context import SearchContext
+
+from fmu.sumo.explorer.objects import CPGrid, CPGridProperty
+from fmu.sumo.explorer.objects.cpgrid import _grid_geometries
+
+
+def _metadata(cls, uuid, name, realization, **data):
+    return {
+        "_id": uuid,
+        "_source": {
+            "class": cls,
+            "data": {"name": name, **data.pop("data", {})},
+            "fmu": {
+                "case": {"uuid": "case"},
+                "ensemble": {"name": "iter-0"},
+                "realization": {"id": realization},
+            },
+            "file": data,
+        },
+    }
+
+
+def test_resolve_grids_matching():
+    """Test pairing properties with grids by geometry path or tagname."""
+    props = [
+        CPGridProperty(
+            None,
+            _metadata(
+                "cpgrid_property",
+                f"prop-{real}",
+                "PORO",
+                real,
+                data={
+                    "tagname": "geogrid",
+                    "geometry": {"relative_path": f"real-{real}/grid.roff"},
+                },
+            ),
+        )
+        for real in range(3)
+    ]
+    grids = [
+        CPGrid(
+            None,
+            _metadata(
+                "cpgrid",
+                "grid-0",
+                "other",
+                0,
+                relative_path="real-0/grid.roff",
+            ),
+        ),
+        CPGrid(None, _metadata("cpgrid", "grid-1", "geogrid", 1)),
+    ]
+    sc = SearchContext(None)
+    assert sc._grid_context(props) is not None
+    matched = sc._match_grids(props, grids)
+    assert {prop: grid.uuid for prop, grid in matched.items()} == {
+        "prop-0": "grid-0",
+        "prop-1": "grid-1",
+    }
+
+
+class _FakeGrid:
+    def __init__(self, uuid, actnum):
+        self.uuid = uuid
+        self.actnum_array = actnum
+        self.released = False
+
+    def to_cpgrid(self):
+        return self
+
+    def release(self):
+        self.released = True
+
+
+class _FakeProperty:
+    def __init__(self, realization, values, name="PORO", time=None):
+        self.uuid = f"prop-{name}-{realization}-{time}"
+        self.name = name
+        self.realization = realization
+        self.timestamp = time
+        self.interval = None
+        self._values = values
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+    def to_cpgrid_property(self):
+        return type("GridProperty", (), {"values": self._values})
+
+
+def test_to_memmap(tmp_path, monkeypatch):
+    """Test streaming properties into a realization x cell array."""
+    actnum = np.array([[[1, 0], [1, 1]]])
+    grids = {
+        0: _FakeGrid("grid-a", actnum),
+        1: _FakeGrid("grid-b", np.array([[[1, 1], [0, 1]]])),
+    }
+    props = [
+        _FakeProperty(real, np.ma.masked_array(np.full((1, 2, 2), real)))
+        for real in (1, 0)
+    ]
+    sc = SearchContext(None)
+    monkeypatch.setattr(sc, "_search_all", lambda select: props)
+    monkeypatch.setattr(sc, "_objects_of_class", lambda hits, cls: hits)
+    monkeypatch.setattr(
+        sc,
+        "_grids_for",
+        lambda props: {p.uuid: grids[p.realization] for p in props},
+    )
+    array, coords = sc.to_memmap(tmp_path / "prop.npy")
+    np.testing.assert_array_equal(coords["REAL"], [0, 1])
+    np.testing.assert_array_equal(coords["cell"], [0, 1, 2, 3])
+    np.testing.assert_array_equal(
+        array, [[0, np.nan, 0, 0], [1, 1, np.nan, 1]]
+    )
+    np.testing.assert_array_equal(np.load(tmp_path / "prop.npy"), array)
+    assert all(prop.released for prop in props)
+    assert all(grid.released for grid in grids.values())
+    assert len(_grid_geometries.cache) == 0
+
+
+class _FakeContext:
+    def __init__(self, props):
+        self._props = props
+        self._select = None
+
+    def filter(self, name):
+        names = name if isinstance(name, list) else [name]
+        return _FakeContext([p for p in self._props if p.name in names])
+
+    def _search_all(self, select):
+        return self._props
+
+
+def _loadable_grid(monkeypatch, props):
+    grid = CPGrid(None, _metadata("cpgrid", "grid", "geogrid", 0))
+    fake = _FakeGrid("grid", np.array([[[1, 0], [1, 1]]]))
+    monkeypatch.setattr(
+        CPGrid, "grid_properties", property(lambda self: _FakeContext(props))
+    )
+    monkeypatch.setattr(grid, "_geometry", lambda: fake)
+    monkeypatch.setattr(grid, "_property_objects", lambda hits: hits)
+    return grid
+
+
+def test_load_with_properties(monkeypatch):
+    """Test that properties are aligned to the active cells, and that
+    properties sharing a name are keyed by date."""
+    values = np.arange(4).reshape(1, 2, 2)
+    props = [
+        _FakeProperty(0, np.ma.masked_array(values), "PORO"),
+        _FakeProperty(0, values + 10, "SWAT", "2018-01-01T00:00:00"),
+        _FakeProperty(0, values + 20, "SWAT", "2019-07-01T00:00:00"),
+    ]
+    grid = _loadable_grid(monkeypatch, props)
+    geometry, loaded = grid.load_with_properties()
+    assert geometry is grid._geometry()
+    assert sorted(loaded) == ["PORO", "SWAT_20180101", "SWAT_20190701"]
+    np.testing.assert_array_equal(loaded["PORO"], [0, 2, 3])
+    np.testing.assert_array_equal(loaded["SWAT_20190701"], [20, 22, 23])
+    _, loaded = grid.load_with_properties(names="PORO")
+    assert list(loaded) == ["PORO"]
+
+
+def test_load_with_properties_duplicate_names(monkeypatch):
+    """Test that properties sharing a name and time are rejected."""
+    values = np.zeros((1, 2, 2))
+    props = [
+        _FakeProperty(0, values, "SWAT"),
+        _FakeProperty(1, values, "SWAT"),
+    ]
+    grid = _loadable_grid(monkeypatch, props)
+    with pytest.raises(ValueError):
+        grid.load_with_properties()
+
+
+def test_geometry_cache(monkeypatch):
+    """Test that identical grids are decoded once, and that the geometry
+    cache can be resized, disabled and cleared."""
+    decoded = []
+
+    def to_cpgrid(self):
+        decoded.append(self.uuid)
+        return object()
+
+    monkeypatch.setattr(CPGrid, "to_cpgrid", to_cpgrid)
+    grids = [
+        CPGrid(
+            None,
+            _metadata(
+                "cpgrid",
+                f"grid-{real}",
+                "geogrid",
+                real,
+                relative_path=f"realization-{real}/grid.roff",
+                checksum_md5="abc" if real < 2 else "def",
+            ),
+        )
+        for real in range(3)
+    ]
+    try:
+        CPGrid.clear_geometry_cache()
+        assert grids[0]._geometry() is grids[1]._geometry()
+        grids[2]._geometry()
+        assert decoded == ["grid-0", "grid-2"]
+        CPGrid.set_geometry_cache_size(1)
+        assert len(_grid_geometries.cache) == 1
+        CPGrid.set_geometry_cache_size(0)
+        grids[2]._geometry()
+        assert len(_grid_geometries.cache) == 0
+        assert decoded == ["grid-0", "grid-2", "grid-2"]
+        CPGrid.set_geometry_cache_size(4)
+        grids[0]._geometry()
+        CPGrid.clear_geometry_cache()
+        assert len(_grid_geometries.cache) == 0
+    finally:
+        CPGrid.set_geometry_cache_size(4)
+        CPGrid.clear_geometry_cache()
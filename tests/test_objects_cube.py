@@ -0,0 +1,103 @@
+"""Test cube objects.
+
+* Cube slicing through a reader backend
+* Brick cache
+
+"""
+
+import numpy as np
+import pytest
+from context import Cube
+
+from fmu.sumo.explorer.objects.cube import _brick_cache
+
+
+class FakeReader:
+    """In-memory cube reader backend that counts reads."""
+
+    def __init__(self, volume, brick_shape):
+        self.volume = volume
+        self.shape = volume.shape
+        self.brick_shape = brick_shape
+        self.axes = [
+            1000 + np.arange(volume.shape[0]),
+            2000 + 2 * np.arange(volume.shape[1]),
+            4.0 * np.arange(volume.shape[2]),
+        ]
+        self.reads = 0
+
+    def read(self, start, stop):
+        self.reads += 1
+        return self.volume[tuple(slice(a, b) for a, b in zip(start, stop))]
+
+
+@pytest.fixture(name="cube")
+def fixture_cube():
+    """A cube backed by a fake reader, with an empty brick cache."""
+    _brick_cache.clear()
+    metadata = {
+        "_id": "00000000-0000-0000-0000-000000000000",
+        "_source": {"class": "cube", "data": {"name": "test"}},
+    }
+    cube = Cube(None, metadata)
+    volume = np.arange(10 * 7 * 5, dtype=np.float32).reshape(10, 7, 5)
+    cube.reader = FakeReader(volume, (4, 4, 4))
+    return cube
+
+
+def test_cube_slices(cube):
+    """Test inline, crossline, time slice and subvolume reads."""
+    volume = cube.reader.volume
+    np.testing.assert_array_equal(cube.read_inline(1003), volume[3])
+    np.testing.assert_array_equal(cube.read_crossline(2012), volume[:, 6])
+    np.testing.assert_array_equal(cube.read_timeslice(8.0), volume[:, :, 2])
+    np.testing.assert_array_equal(
+        cube.read_subvolume(
+            inlines=(1002, 1008), crosslines=(2010, 2002), samples=(4, 16)
+        ),
+        volume[2:9, 1:6, 1:5],
+    )
+
+
+def test_cube_brick_cache(cube):
+    """Test that adjacent slices reuse cached bricks."""
+    cube.read_inline(1000)
+    reads = cube.reader.reads
+    assert reads == 4
+    cube.read_inline(1001)
+    cube.read_inline(1003)
+    assert cube.reader.reads == reads
+
+
+def test_cube_brick_cache_size(cube):
+    """Test that the brick cache capacity can be changed and cleared."""
+    try:
+        Cube.set_brick_cache_size(2)
+        cube.read_inline(1000)
+        assert len(_brick_cache.cache) == 2
+        Cube.set_brick_cache_size(0)
+        assert len(_brick_cache.cache) == 0
+        reads = cube.reader.reads
+        cube.read_inline(1000)
+        assert cube.reader.reads == reads + 4
+        assert len(_brick_cache.cache) == 0
+        Cube.set_brick_cache_size(256)
+        cube.read_inline(1000)
+        Cube.clear_brick_cache()
+        assert len(_brick_cache.cache) == 0
+    finally:
+        Cube.set_brick_cache_size(256)
+
+
+def test_cube_unknown_inline(cube):
+    """Test that coordinates outside the cube are rejected."""
+    with pytest.raises(ValueError):
+        cube.read_inline(999)
+
+
+def test_cube_read_traces(cube):
+    """Test reading traces at inline/crossline locations."""
+    volume = cube.reader.volume
+    traces = cube.read_traces([(1002, 2004), (1009, 2000)])
+    np.testing.assert_array_equal(traces, volume[[2, 9], [2, 0]])
+    assert cube.reader.reads == 2
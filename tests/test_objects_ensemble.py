@@ -0,0 +1,92 @@
+"""Test ensemble objects.
+
+* Parameter matrix from realization metadata
+* Parameter-response sensitivities
+
+"""
+
+import numpy as np
+import pyarrow as pa
+
+from fmu.sumo.explorer.objects.ensemble import (
+    _average_ranks,
+    _parameter_table,
+    _reduce_responses,
+    _sensitivity_table,
+)
+
+
+def _hit(realization, parameters):
+    return {
+        "_source": {
+            "fmu": {
+                "realization": {"id": realization, "parameters": parameters}
+            }
+        }
+    }
+
+
+def test_parameter_table():
+    """Test flattening and typing realization parameters."""
+    hits = [
+        _hit(2, {"GLOBVAR": {"FWL": 1700, "PORO": 0.2}, "LABEL": "b"}),
+        _hit(0, {"GLOBVAR": {"FWL": 1650.5, "PORO": 0.25}, "LABEL": 3}),
+        _hit(1, {"GLOBVAR": {"FWL": 1680}}),
+    ]
+    table = _parameter_table(hits)
+    assert table.column_names == [
+        "REAL",
+        "GLOBVAR:FWL",
+        "GLOBVAR:PORO",
+        "LABEL",
+    ]
+    assert table["REAL"].to_pylist() == [0, 1, 2]
+    assert table["GLOBVAR:FWL"].to_pylist() == [1650.5, 1680.0, 1700.0]
+    assert table["GLOBVAR:PORO"].to_pylist() == [0.25, None, 0.2]
+    assert table["LABEL"].to_pylist() == ["3", None, "b"]
+    frame = table.to_pandas().set_index("REAL")
+    assert frame.loc[1, "GLOBVAR:FWL"] == 1680.0
+
+
+def test_average_ranks():
+    """Test that tied values share the average of their ranks."""
+    values = np.array([[3.0, 1.0], [1.0, 1.0], [3.0, 2.0], [2.0, 1.0]])
+    np.testing.assert_array_equal(
+        _average_ranks(values),
+        [[3.5, 2.0], [1.0, 2.0], [3.5, 4.0], [2.0, 2.0]],
+    )
+
+
+def test_sensitivity_table():
+    """Test correlations and tornado statistics against direct
+    computation."""
+    rng = np.random.default_rng(0)
+    count = 100
+    a, b = rng.normal(size=(2, count))
+    parameters = pa.table({"REAL": np.arange(count), "A": a, "B": b})
+    volume = np.exp(a) + 0.1 * rng.normal(size=count)
+    # Responses in another realization order, with rows to be summed.
+    responses = _reduce_responses(
+        pa.table(
+            {
+                "REAL": np.tile(np.arange(count)[::-1], 2),
+                "VOLUME": np.tile(volume[::-1] / 2, 2),
+                "ZONE": ["upper"] * count + ["lower"] * count,
+            }
+        ),
+        "sum",
+    )
+    stats = _sensitivity_table(parameters, responses, 0.1).to_pandas()
+    stats = stats.set_index("parameter")
+    np.testing.assert_allclose(
+        stats.loc["A", "pearson"], np.corrcoef(a, volume)[0, 1]
+    )
+    ranks = np.argsort(np.argsort(volume))
+    np.testing.assert_allclose(
+        stats.loc["A", "spearman"],
+        np.corrcoef(np.argsort(np.argsort(a)), ranks)[0, 1],
+    )
+    low = volume[a <= np.quantile(a, 0.1)].mean() - volume.mean()
+    np.testing.assert_allclose(stats.loc["A", "low"], low)
+    assert stats.loc["A", "swing"] > 5 * stats.loc["B", "swing"]
+    assert (stats["realizations"] == count).all()
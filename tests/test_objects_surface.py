@@ -0,0 +1,225 @@
+"""Test surface objects.
+
+* Surface
+* IRAP binary decoding
+* Point sampling
+* Zonal statistics
+* Local surface statistics
+
+"""
+
+import struct
+from io import BytesIO
+
+import numpy as np
+import pytest
+from context import SearchContext, Surface
+
+from fmu.sumo.explorer.objects.surface import (
+    _bilinear_weights,
+    _node_coordinates,
+    _rasterize_polygon,
+    _RunningStatistics,
+    _sample,
+    _zonal_statistics,
+)
+
+
+def test_running_statistics():
+    """Test running statistics against numpy on masked data."""
+    rng = np.random.default_rng(0)
+    data = rng.normal(10.0, 2.0, size=(50, 6, 7))
+    mask = rng.random(data.shape) < 0.1
+    mask[:, 0, 0] = True
+    stats = _RunningStatistics(["mean", "std", "min", "max", "p50"])
+    for values, nodes in zip(data, mask):
+        stats.add(np.ma.MaskedArray(values, mask=nodes))
+    expected = np.ma.MaskedArray(data, mask=mask)
+    for operation, reference in [
+        ("mean", expected.mean(axis=0)),
+        ("std", expected.std(axis=0)),
+        ("min", expected.min(axis=0)),
+        ("max", expected.max(axis=0)),
+    ]:
+        result = stats.result(operation)
+        assert result.mask[0, 0]
+        np.testing.assert_allclose(result[1:], reference[1:])
+    median = np.nanpercentile(np.where(mask, np.nan, data)[:, 1:], 50, axis=0)
+    assert np.abs(stats.result("p50")[1:] - median).max() < 0.5
+
+
+def test_running_statistics_local_bins():
+    """Test that quantile bins follow each node's spread, not the range
+    of the whole grid: a 1000 m trend across the grid with 10 m noise."""
+    rng = np.random.default_rng(1)
+    trend = np.linspace(0.0, 1000.0, 20 * 30).reshape(20, 30)
+    data = trend + rng.normal(0.0, 10.0, size=(200, 20, 30))
+    stats = _RunningStatistics(["p10", "p90"])
+    for values in data:
+        stats.add(values)
+    for operation, q in [("p10", 10), ("p90", 90)]:
+        expected = np.percentile(data, q, axis=0)
+        assert np.abs(stats.result(operation) - expected).max() < 2.5
+
+
+def test_running_statistics_exact_quantiles():
+    """Test that quantiles of a few realizations are exact."""
+    rng = np.random.default_rng(2)
+    data = rng.normal(size=(5, 3, 4))
+    stats = _RunningStatistics(["p10"])
+    for values in data:
+        stats.add(values)
+    np.testing.assert_allclose(
+        stats.result("p10"), np.quantile(data, 0.1, axis=0)
+    )
+
+
+def test_running_statistics_unknown_operation():
+    """Test that unknown operations are rejected up front."""
+    with pytest.raises(ValueError):
+        _RunningStatistics(["median"])
+
+
+def _irap_binary(values, xori, yori, xinc, yinc, rotation, per):
+    """Write values (ncol, nrow) as IRAP binary, per values per record."""
+    ncol, nrow = values.shape
+
+    def record(fmt, *items):
+        body = struct.pack(">" + fmt, *items)
+        size = struct.pack(">i", len(body))
+        return size + body + size
+
+    xmax = xori + (ncol - 1) * xinc
+    ymax = yori + (nrow - 1) * yinc
+    blob = record("ii6f", -996, nrow, xori, xmax, yori, ymax, xinc, yinc)
+    blob += record("i3f", ncol, rotation, xori, yori)
+    blob += record("7i", *[0] * 7)
+    flat = values.filled(9999900.0).T.ravel()
+    for start in range(0, flat.size, per):
+        chunk = flat[start : start + per]
+        blob += record(f"{chunk.size}f", *chunk)
+    return BytesIO(blob)
+
+
+@pytest.mark.parametrize("per", [4, 5, 1000])
+def test_surface_to_numpy(per):
+    """Test decoding IRAP binary blobs with different record sizes."""
+    values = np.ma.MaskedArray(
+        np.arange(12, dtype=np.float64).reshape(4, 3), mask=False
+    )
+    values[1, 2] = np.ma.masked
+    blob = _irap_binary(values, 10.0, 20.0, 25.0, -50.0, 30.0, per)
+    metadata = {
+        "_id": "00000000-0000-0000-0000-000000000000",
+        "_source": {
+            "class": "surface",
+            "data": {"name": "test", "format": "irap_binary"},
+        },
+    }
+    surface = Surface(None, metadata, blob)
+    result = surface.to_numpy()
+    assert result.shape == (4, 3)
+    assert result.mask.tolist() == values.mask.tolist()
+    np.testing.assert_array_equal(result.compressed(), values.compressed())
+    geometry = surface.geometry
+    assert (geometry["ncol"], geometry["nrow"]) == (4, 3)
+    assert (geometry["yinc"], geometry["yflip"]) == (50.0, -1)
+    assert geometry["rotation"] == 30.0
+
+
+@pytest.mark.parametrize("yflip", [1, -1])
+def test_surface_bilinear_sampling(yflip):
+    """Test that bilinear sampling reproduces a planar surface on a
+    rotated grid, and masks points outside the grid."""
+    geometry = {
+        "ncol": 5,
+        "nrow": 4,
+        "xori": 100.0,
+        "yori": 200.0,
+        "xinc": 10.0,
+        "yinc": 20.0,
+        "yflip": yflip,
+        "rotation": 30.0,
+    }
+    angle = np.radians(geometry["rotation"])
+    i, j = np.meshgrid(np.arange(5), np.arange(4), indexing="ij")
+    u, v = i * 10.0, j * 20.0 * yflip
+    x = 100.0 + u * np.cos(angle) - v * np.sin(angle)
+    y = 200.0 + u * np.sin(angle) + v * np.cos(angle)
+    values = np.ma.MaskedArray(2 * x + 3 * y)
+    points = np.array(
+        [
+            [x[1, 1], y[1, 1]],
+            [(x[2, 1] + x[3, 2]) / 2, (y[2, 1] + y[3, 2]) / 2],
+            [0.0, 0.0],
+        ]
+    )
+    result = _sample(values, *_bilinear_weights(geometry, points))
+    np.testing.assert_allclose(
+        result[:2], 2 * points[:2, 0] + 3 * points[:2, 1]
+    )
+    assert result.mask.tolist() == [False, False, True]
+
+
+def test_surface_zonal_statistics():
+    """Test rasterizing a polygon and computing statistics inside it."""
+    geometry = {
+        "ncol": 10,
+        "nrow": 10,
+        "xori": 0.0,
+        "yori": 0.0,
+        "xinc": 1.0,
+        "yinc": 1.0,
+        "yflip": 1,
+        "rotation": 0.0,
+    }
+    x, y = _node_coordinates(geometry)
+    values = np.ma.MaskedArray(x + 10 * y, mask=False)
+    values[3, 3] = np.ma.masked
+    square = np.array([[2.5, 2.5], [5.5, 2.5], [5.5, 5.5], [2.5, 5.5]])
+    triangle = np.array([[-1.0, -1.0], [0.5, -1.0], [-1.0, 0.5]])
+    cells = [_rasterize_polygon(x, y, ring) for ring in [square, triangle]]
+    assert sorted(zip(*cells[0])) == [
+        (i, j) for i in range(3, 6) for j in range(3, 6)
+    ]
+    inside, empty = _zonal_statistics(values, cells)
+    expected = values[3:6, 3:6].compressed()
+    assert inside[0] == 8
+    assert inside[1:] == pytest.approx(
+        (expected.mean(), expected.std(), expected.min(), expected.max())
+    )
+    assert empty[0] == 0
+    assert np.isnan(empty[1])
+
+
+class _FakeSurface:
+    def __init__(self, values, **geometry):
+        self.geometry = {
+            "ncol": 2,
+            "nrow": 3,
+            "xori": 0.0,
+            "yori": 0.0,
+            "xinc": 25.0,
+            "yinc": 25.0,
+            "yflip": 1,
+            "rotation": 0.0,
+            **geometry,
+        }
+        self._values = values
+
+    def to_numpy(self):
+        return self._values
+
+    def release(self):
+        pass
+
+
+def test_aggregate_locally_different_geometries(monkeypatch):
+    """Test that surfaces on different grids are not aggregated."""
+    values = np.ma.zeros((2, 3))
+    surfaces = [_FakeSurface(values), _FakeSurface(values, xori=100.0)]
+    sc = SearchContext(None)
+    monkeypatch.setattr(sc, "_search_all", lambda select: surfaces)
+    monkeypatch.setattr(sc, "_objects_of_class", lambda hits, cls: hits)
+    with pytest.raises(ValueError, match="different geometries"):
+        sc.aggregate_locally("mean")
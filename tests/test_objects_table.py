@@ -6,11 +6,28 @@
 
 """
 
+from io import BytesIO
+
 import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.feather as pf
+import pyarrow.parquet as pq
 import pytest
+from context import SearchContext, Table
 
 from fmu.sumo.explorer import Explorer
+from fmu.sumo.explorer.objects._search_context import _referenced_names
+from fmu.sumo.explorer.objects.table import (
+    _FOOTER_READ_SIZE,
+    _csv_column_types,
+    _IpcFileWriter,
+    _merge_collections,
+    _realization_array,
+    _resolve_context_columns,
+    _stack_tables,
+)
 
 # Fixed test case ("Drogon_AHM_2023-02-22") in Sumo/DEV
 TESTCASE_UUID = "10f41041-2c17-4374-a735-bb0de62e29dc"
@@ -47,3 +64,462 @@ def test_table_to_arrow(table):
     """Test the to_arrow() method"""
     arrow = table.to_arrow()
     assert isinstance(arrow, pa.Table)
+
+
+def test_table_footer(table):
+    """Test schema, row count and statistics without a full download."""
+    schema = table.schema()
+    num_rows = table.num_rows()
+    stats = table.column_statistics()
+    arrow = table.to_arrow()
+    assert schema.names == arrow.schema.names
+    assert num_rows == arrow.num_rows
+    assert set(stats) <= set(arrow.column_names)
+
+
+### Table contexts
+
+
+def test_table_context_to_arrow(case):
+    """Test stacking the tables in a context."""
+    tables = case.tables.filter(realization=[0, 1])
+    first = tables[0]
+    sc = tables.filter(
+        name=first.name, tagname=first.tagname, ensemble=first.ensemble
+    )
+    arrow = sc.to_arrow()
+    assert isinstance(arrow, pa.Table)
+    assert set(arrow["REAL"].to_pylist()) == set(sc.realizationids)
+    assert len(sc.to_pandas()) == arrow.num_rows
+
+
+def _make_table(dataformat, blob):
+    """Make a Table object backed by an in-memory blob."""
+    metadata = {
+        "_id": "00000000-0000-0000-0000-000000000000",
+        "_source": {
+            "class": "table",
+            "data": {"name": "test", "format": dataformat},
+        },
+    }
+    return Table(None, metadata, blob)
+
+
+def _write_blob(arrow, fmt):
+    blob = BytesIO()
+    if fmt == "parquet":
+        pq.write_table(arrow, blob)
+    elif fmt == "arrow":
+        pf.write_feather(arrow, blob)
+    else:
+        arrow.to_pandas().to_csv(blob, index=False)
+    blob.seek(0)
+    return blob
+
+
+@pytest.mark.parametrize("actual", ["csv", "parquet", "arrow"])
+@pytest.mark.parametrize("declared", ["csv", "parquet", "arrow"])
+def test_table_format_sniffing(declared, actual):
+    """Test that blobs are decoded according to their content, not
+    their (possibly wrong) metadata."""
+    arrow = pa.table({"A": [1, 2, 3], "B": [0.5, 1.5, 2.5]})
+    table = _make_table(declared, _write_blob(arrow, actual))
+    assert table.to_arrow().select(["A", "B"]).equals(arrow)
+    assert table.to_pandas()["B"].tolist() == [0.5, 1.5, 2.5]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_table_column_projection(fmt):
+    """Test column selection by name and by regular expression."""
+    arrow = pa.table(
+        {"DATE": [1, 2], "FOPT": [1.0, 2.0], "WOPT:OP_1": [3.0, 4.0]}
+    )
+    table = _make_table(fmt, _write_blob(arrow, fmt))
+    table._metadata["data"]["spec"] = {"columns": arrow.column_names}
+    assert table.to_arrow(columns=["DATE", "W.*"]).column_names == [
+        "DATE",
+        "WOPT:OP_1",
+    ]
+    assert list(table.to_pandas(columns="FOPT").columns) == ["FOPT"]
+    with pytest.raises(ValueError):
+        table.to_arrow(columns=["GOPT"])
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_table_row_filter(fmt):
+    """Test row filtering, also on columns outside the projection."""
+    arrow = pa.table({"DATE": list(range(100)), "FOPT": [1.0] * 100})
+    table = _make_table(fmt, _write_blob(arrow, fmt))
+    filtered = table.to_arrow(columns=["FOPT"], filter=pc.field("DATE") >= 95)
+    assert filtered.column_names == ["FOPT"]
+    assert filtered.num_rows == 5
+    df = table.to_pandas(filter=[("DATE", "<", 10)])
+    assert len(df) == 10
+
+
+def test_table_pandas_from_cached_arrow():
+    """Test that to_pandas reuses the decoded arrow table."""
+    arrow = pa.table({"DATE": [1, 2], "FOPT": [1.0, 2.0]})
+    table = _make_table("parquet", _write_blob(arrow, "parquet"))
+    assert table.to_arrow() is table.to_arrow()
+    table._blob = None
+    df = table.to_pandas(dtype_backend="pyarrow")
+    assert isinstance(df["FOPT"].dtype, pd.ArrowDtype)
+    table.release()
+    assert table._arrowtable is None
+
+
+def _csv_table(case, content):
+    table = _make_table("csv", BytesIO(content))
+    table._metadata["fmu"] = {"case": {"uuid": case}}
+    return table
+
+
+@pytest.mark.parametrize("order", [[0, 1, 2], [1, 0, 2], [2, 1, 0]])
+def test_table_csv_column_types_cached(order):
+    """Test that csv column types are cached, and that the type of each
+    column does not depend on the order the tables are read in."""
+    case = f"case-{order}"
+    contents = [
+        b"REAL,VOLUME\n0,10\n1,11\n",
+        b"REAL,VOLUME\n2,10.5\n3,11\n",
+        b"REAL,VOLUME\n4,\n5,\n",
+    ]
+    expected = [pa.int64(), pa.float64(), pa.null()]
+    for index in order:
+        schema = _csv_table(case, contents[index]).to_arrow().schema
+        assert schema.field("VOLUME").type == expected[index]
+        assert schema.field("REAL").type == pa.int64()
+    assert _csv_column_types.get((case, None, "test", None)) == {
+        "REAL": pa.int64(),
+        "VOLUME": pa.float64(),
+    }
+
+
+def test_table_csv_column_types_not_forced():
+    """Test that cached non-integer csv column types do not override
+    inference."""
+    first = _make_table("csv", BytesIO(b"REGION,VOLUME\nA,10.5\n"))
+    assert first.to_arrow().schema.field("REGION").type == pa.string()
+    second = _make_table("csv", BytesIO(b"REGION,VOLUME\n1,10\n"))
+    schema = second.to_arrow().schema
+    assert schema.field("REGION").type == pa.int64()
+    assert schema.field("VOLUME").type == pa.int64()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_table_iter_batches(fmt):
+    """Test streaming a table as record batches."""
+    arrow = pa.table({"DATE": list(range(10)), "FOPT": [1.0] * 10})
+    table = _make_table(fmt, _write_blob(arrow, fmt))
+    table._metadata["data"]["spec"] = {"columns": arrow.column_names}
+    batches = list(table.iter_batches(batch_size=4, columns=["FOPT"]))
+    assert max(batch.num_rows for batch in batches) <= 4
+    assert sum(batch.num_rows for batch in batches) == 10
+    assert all(batch.schema.names == ["FOPT"] for batch in batches)
+
+
+def test_table_stack_mixed_types():
+    """Test stacking realization csv tables whose columns are read with
+    different types."""
+    tables = []
+    for real, content in enumerate(
+        [b"ZONE,STOIIP\n1,10\n", b"ZONE,STOIIP\nA,10.5\n", b"STOIIP\n7\n"]
+    ):
+        table = _csv_table("stack", content)
+        table._metadata["fmu"]["realization"] = {"id": real}
+        tables.append(table)
+    sc = SearchContext(None)
+    stacked = _stack_tables(tables, sc._download_tables(tables))
+    assert stacked.schema.field("STOIIP").type == pa.float64()
+    assert stacked.schema.field("ZONE").type == pa.string()
+    assert stacked["STOIIP"].to_pylist() == [10.0, 10.5, 7.0]
+    assert stacked["ZONE"].to_pylist() == ["1", "A", None]
+    assert stacked["REAL"].to_pylist() == [0, 1, 2]
+    assert _stack_tables([], []).num_rows == 0
+
+
+def test_table_context_to_arrow_ipc(tmp_path, monkeypatch):
+    """Test exporting tables from several ensembles and realizations to
+    a single IPC file and to a partitioned dataset."""
+    fetched = []
+    for ensemble in ["iter-0", "iter-1"]:
+        for real in [0, 1]:
+            table = _make_table("arrow", None)
+            table._metadata["fmu"] = {
+                "ensemble": {"name": ensemble},
+                "realization": {"id": real},
+            }
+            # The first table has integer values only.
+            fopt = [real, real + 1] if real == 0 else [real, real + 0.5]
+            arrow = pa.table({"DATE": [1, 2], "FOPT": fopt})
+            fetched.append((table, arrow))
+    sc = SearchContext(None)
+    monkeypatch.setattr(
+        sc, "_iter_fetched_tables", lambda columns, filter: iter(fetched)
+    )
+    sc.to_arrow_ipc(tmp_path / "summary.arrow")
+    with pa.memory_map(str(tmp_path / "summary.arrow")) as source:
+        single = pa.ipc.open_file(source).read_all()
+    assert single.column_names == ["ENSEMBLE", "REAL", "DATE", "FOPT"]
+    assert single.schema.field("REAL").type == pa.int64()
+    assert single.schema.field("FOPT").type == pa.float64()
+    assert single.num_rows == 8
+    assert single["ENSEMBLE"].to_pylist() == ["iter-0"] * 4 + ["iter-1"] * 4
+    sc.to_arrow_ipc(tmp_path / "summary", partitioned=True)
+    dataset = ds.dataset(
+        tmp_path / "summary", format="ipc", partitioning="hive"
+    ).to_table()
+    assert dataset.num_rows == 8
+    assert set(dataset.column_names) == {"ENSEMBLE", "REAL", "DATE", "FOPT"}
+    iter1 = dataset.filter(pc.field("ENSEMBLE") == "iter-1")
+    assert sorted(iter1["FOPT"].to_pylist()) == [0.0, 1.0, 1.0, 1.5]
+
+
+def test_table_to_polars():
+    """Test column projection and row filtering to polars."""
+    arrow = pa.table({"DATE": list(range(10)), "FOPT": [1.0] * 10})
+    table = _make_table("parquet", _write_blob(arrow, "parquet"))
+    table._metadata["data"]["spec"] = {"columns": arrow.column_names}
+    df = table.to_polars(columns=["FOPT"], filter=pc.field("DATE") < 3)
+    assert df.columns == ["FOPT"]
+    assert df["FOPT"].to_list() == [1.0, 1.0, 1.0]
+    assert table.to_polars().shape == (10, 2)
+
+
+def test_referenced_names():
+    """Test that table names are matched as whole identifiers."""
+    names = ["summary", "summary_stats", "vol"]
+    assert _referenced_names("SELECT * FROM summary_stats", names) == [
+        "summary_stats"
+    ]
+    assert _referenced_names(
+        "SELECT s.DATE FROM summary s JOIN summary_stats t USING (DATE)",
+        names,
+    ) == ["summary", "summary_stats"]
+    assert _referenced_names("SELECT t.vol FROM volumes t", names) == []
+
+
+def test_table_context_sql(monkeypatch):
+    """Test that sql registers, and downloads, only the referenced
+    tables."""
+    tables = {
+        "summary": pa.table({"REAL": [0, 0, 1], "FOPT": [1.0, 2.0, 4.0]}),
+        "summary_stats": pa.table({"FOPT": [9.0]}),
+    }
+    downloaded = []
+
+    class _NamedTables:
+        def __init__(self, name):
+            self._name = name
+
+        def to_arrow(self):
+            downloaded.append(self._name)
+            return tables[self._name]
+
+    sc = SearchContext(None)
+    monkeypatch.setattr(
+        SearchContext, "names", property(lambda self: list(tables))
+    )
+    monkeypatch.setattr(sc, "filter", lambda name: _NamedTables(name))
+    result = sc.sql(
+        "SELECT REAL, max(FOPT) AS FOPT FROM summary GROUP BY REAL "
+        "ORDER BY REAL"
+    )
+    assert downloaded == ["summary"]
+    assert result.to_pydict() == {"REAL": [0, 1], "FOPT": [2.0, 4.0]}
+
+
+def test_table_ipc_writer_mismatch(tmp_path):
+    """Test that a column that does not fit the file schema is reported
+    clearly."""
+    table = _make_table("arrow", None)
+    writer = _IpcFileWriter(tmp_path / "mismatch.arrow")
+    writer.write(table, pa.table({"ZONE": [1, 2]}))
+    with pytest.raises(ValueError, match="ZONE"):
+        writer.write(table, pa.table({"ZONE": ["upper", "lower"]}))
+    writer.close()
+
+
+def test_table_iter_batches_csv_late_float():
+    """Test streaming a csv table whose column first shows a decimal
+    after the first block."""
+    rows = b"".join(b"%d,10\n" % i for i in range(200000))
+    content = b"REAL,VOLUME\n" + rows + b"200000,10.5\n"
+    table = _csv_table("late", content)
+    assert table.to_arrow()["VOLUME"][-1].as_py() == 10.5
+    table._arrowtable = None
+    batches = list(table.iter_batches())
+    assert batches[0].schema.field("VOLUME").type == pa.float64()
+    assert batches[-1]["VOLUME"][-1].as_py() == 10.5
+    assert sum(batch.num_rows for batch in batches) == 200001
+
+
+def test_table_context_batch_reader(monkeypatch):
+    """Test that the batch reader schema fits later tables with floats
+    in a column that is integer in the first table."""
+    batches = [
+        pa.record_batch({"REAL": [0], "VOLUME": [10]}),
+        pa.record_batch({"REAL": [1], "VOLUME": [10.5]}),
+    ]
+    sc = SearchContext(None)
+    monkeypatch.setattr(
+        sc, "iter_batches", lambda batch_size, columns: iter(batches)
+    )
+    result = sc.to_batch_reader().read_all()
+    assert result.schema.field("REAL").type == pa.int64()
+    assert result["VOLUME"].to_pylist() == [10.0, 10.5]
+
+
+def _remote_parquet(monkeypatch, arrow, uuid, row_group_size):
+    """A parquet Table without a blob, whose tail reads are served from
+    an in-memory file and counted."""
+    buffer = BytesIO()
+    pq.write_table(arrow, buffer, row_group_size=row_group_size)
+    data = buffer.getvalue()
+    table = _make_table("parquet", None)
+    table._uuid = uuid
+    table._metadata["data"]["spec"] = {"columns": arrow.column_names}
+    reads = []
+
+    def read_tail(nbytes):
+        reads.append(nbytes)
+        return data[-nbytes:], len(data)
+
+    monkeypatch.setattr(table, "_read_blob_tail", read_tail)
+    return table, reads
+
+
+def test_table_footer_offline(monkeypatch):
+    """Test schema, row count and statistics from a parquet footer read
+    through ranged tail reads."""
+    arrow = pa.table(
+        {
+            "DATE": list(range(1000)),
+            "FOPT": [float(i) / 2 for i in range(1000)],
+            "WELL": [
+                None if i % 10 == 0 else f"W{i % 3}" for i in range(1000)
+            ],
+        }
+    )
+    table, reads = _remote_parquet(monkeypatch, arrow, "footer-small", 300)
+    assert table.num_rows() == 1000
+    assert table.schema() == arrow.schema
+    stats = table.column_statistics()
+    assert stats["DATE"] == {"min": 0, "max": 999, "null_count": 0}
+    assert stats["FOPT"]["max"] == 499.5
+    assert stats["WELL"] == {"min": "W0", "max": "W2", "null_count": 100}
+    assert list(table.column_statistics(columns="F.*")) == ["FOPT"]
+    assert reads == [_FOOTER_READ_SIZE]
+
+
+def test_table_footer_offline_large(monkeypatch):
+    """Test a footer larger than the first tail read, which needs a
+    second read."""
+    arrow = pa.table({f"COLUMN_{i:04d}": [1.0, 2.0] for i in range(2000)})
+    table, reads = _remote_parquet(monkeypatch, arrow, "footer-large", 1)
+    assert table.num_rows() == 2
+    assert table.schema().names == arrow.column_names
+    assert table.column_statistics()["COLUMN_1999"]["max"] == 2.0
+    assert len(reads) == 2
+    assert reads[1] > _FOOTER_READ_SIZE
+
+
+def test_table_merge_collections():
+    """Test merging single-column collections on their key columns."""
+    fopt = pa.table({"DATE": [1, 2, 1, 2], "REAL": [0, 0, 1, 1]})
+    fopt = fopt.append_column("FOPT", pa.array([1.0, 2.0, 3.0, 4.0]))
+    fgpt = fopt.drop_columns(["FOPT"]).append_column(
+        "FGPT", pa.array([5.0, 6.0, 7.0, 8.0])
+    )
+    merged = _merge_collections(
+        [fopt, fgpt], ["FOPT", "FGPT"], ["DATE", "REAL"]
+    )
+    assert merged.column_names == ["DATE", "REAL", "FOPT", "FGPT"]
+    assert merged["FGPT"].to_pylist() == [5.0, 6.0, 7.0, 8.0]
+    merged = _merge_collections(
+        [fopt, fgpt.slice(0, 3)], ["FOPT", "FGPT"], ["DATE", "REAL"]
+    )
+    assert merged.num_rows == 4
+    assert merged["FGPT"].null_count == 1
+
+
+def _collection_hit(uuid, column, timestamp):
+    return {
+        "_id": uuid,
+        "_source": {
+            "_sumo": {"timestamp": timestamp},
+            "data": {"spec": {"columns": ["DATE", "REAL", column]}},
+        },
+    }
+
+
+def test_table_batch_aggregation_to_arrow(monkeypatch):
+    """Test that collections are looked up for the entity and ensemble
+    that batch_aggregate used, without the realization filter of the
+    context, and that the newest collection of each column is used."""
+    keys = {"DATE": [1, 2], "REAL": [0, 0]}
+    collections = {
+        "fopt-old": pa.table({**keys, "FOPT": [0.0, 0.0]}),
+        "fopt": pa.table({**keys, "FOPT": [1.0, 2.0]}),
+        "fgpt": pa.table({**keys, "FGPT": [3.0, 4.0]}),
+    }
+    hits = [
+        _collection_hit("fopt-old", "FOPT", "2024-01-01T00:00:00"),
+        _collection_hit("fopt", "FOPT", "2024-02-01T00:00:00"),
+        _collection_hit("fgpt", "FGPT", "2024-02-01T00:00:00"),
+    ]
+    queries = []
+
+    def search_all(self, select):
+        queries.append(self._query)
+        return hits
+
+    monkeypatch.setattr(
+        SearchContext, "_batch_source", lambda self, columns: self
+    )
+    monkeypatch.setattr(
+        SearchContext,
+        "_verify_aggregation_operation",
+        lambda self, columns: ("case", "table", "entity", "iter-0", None),
+    )
+    monkeypatch.setattr(SearchContext, "_search_all", search_all)
+    monkeypatch.setattr(
+        SearchContext,
+        "_table_objects",
+        lambda self, hits: [type("T", (), {"uuid": h["_id"]}) for h in hits],
+    )
+    monkeypatch.setattr(
+        SearchContext,
+        "_download_tables",
+        lambda self, tables: [collections[t.uuid] for t in tables],
+    )
+    sc = SearchContext(None).filter(realization=True, name="summary")
+    merged = sc.batch_aggregation_to_arrow(["FOPT", "FGPT"])
+    assert merged.column_names == ["DATE", "REAL", "FOPT", "FGPT"]
+    assert merged["FOPT"].to_pylist() == [1.0, 2.0]
+    terms = queries[0]["bool"]["filter"]
+    assert {"term": {"fmu.entity.uuid.keyword": "entity"}} in terms
+    assert {"term": {"fmu.ensemble.name.keyword": "iter-0"}} in terms
+    assert "fmu.realization.id" not in str(queries[0])
+    assert "data.name.keyword" not in str(queries[0])
+
+
+def test_table_realization_array():
+    """Test aligning realizations on DATE in a masked array."""
+    first = pa.table({"DATE": [1, 2, 3], "FOPT": [1.0, 2.0, 3.0]})
+    second = pa.table({"DATE": [2, 4], "FOPT": [5.0, None]})
+    tables = []
+    for real in [3, 1]:
+        table = _make_table("arrow", None)
+        table._metadata["fmu"] = {"realization": {"id": real}}
+        table._metadata["data"]["spec"] = {"columns": ["DATE", "FOPT"]}
+        tables.append(table)
+    names = _resolve_context_columns(tables, ["F.*"], "DATE")
+    assert names == ["FOPT"]
+    values, coords = _realization_array(tables, [first, second], names, "DATE")
+    assert values.shape == (2, 4, 1)
+    assert list(coords["REAL"]) == [1, 3]
+    assert list(coords["DATE"]) == [1, 2, 3, 4]
+    assert values[0, :, 0].tolist() == [None, 5.0, None, None]
+    assert values[1, :, 0].tolist() == [1.0, 2.0, 3.0, None]
@@ -0,0 +1,40 @@
+"""Test spatial lookups.
+
+* BBoxIndex
+* bbox filter
+
+"""
+
+import numpy as np
+import pytest
+from context import SearchContext
+
+from fmu.sumo.explorer import BBoxIndex
+
+
+@pytest.mark.parametrize("count", [0, 5, 1000])
+def test_bbox_index_matches_brute_force(count):
+    """Test R-tree queries against testing every bounding box."""
+    rng = np.random.default_rng(0)
+    corners = rng.uniform(0, 1000, size=(count, 2))
+    bboxes = np.hstack([corners, corners + rng.uniform(1, 50, (count, 2))])
+    keys = [f"obj-{i}" for i in range(count)]
+    index = BBoxIndex(keys, bboxes)
+    assert len(index) == count
+    for area in [(100, 100, 200, 300), (-10, -10, 0, 0), (0, 0, 2000, 2000)]:
+        xmin, ymin, xmax, ymax = area
+        expected = {
+            key
+            for key, (bx0, by0, bx1, by1) in zip(keys, bboxes)
+            if bx0 <= xmax and bx1 >= xmin and by0 <= ymax and by1 >= ymin
+        }
+        assert set(index.query(area)) == expected
+
+
+def test_bbox_filter_query():
+    """Test that the bbox filter compiles to range queries."""
+    sc = SearchContext(None).filter(bbox=(1, 2, 3, 4))
+    (area,) = sc._query["bool"]["filter"]
+    ranges = area["bool"]["filter"]
+    assert {"range": {"data.bbox.xmin": {"lte": 3}}} in ranges
+    assert {"range": {"data.bbox.ymax": {"gte": 2}}} in ranges